@@ -0,0 +1,162 @@
+"""Candle resampling and LTTB downsampling for chart endpoints"""
+
+import time
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.tsdb import CANDLE_FIELDS
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# Bucket size and alignment offset in seconds; weeks start on Monday 00:00 UTC
+# (the Unix epoch was a Thursday)
+TIMEFRAMES = {
+    "1h": (HOUR, 0),
+    "4h": (4 * HOUR, 0),
+    "1d": (DAY, 0),
+    "1w": (WEEK, 4 * DAY),
+}
+
+
+def resample(candles, timeframe: str) -> list:
+    """Aggregate time-ordered candles into bars of the given timeframe"""
+    size, offset = TIMEFRAMES[timeframe]
+    if not candles or size == HOUR:
+        return list(candles)
+    if np is None:
+        return _resample_python(candles, size, offset)
+
+    columns = {field: np.array([c[field] or 0 for c in candles], dtype=np.float64) for field in CANDLE_FIELDS}
+    keys = (columns["time"].astype(np.int64) - offset) // size
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+    bars = zip(
+        (keys[starts] * size + offset).tolist(),
+        columns["open"][starts].tolist(),
+        np.maximum.reduceat(columns["high"], starts).tolist(),
+        np.minimum.reduceat(columns["low"], starts).tolist(),
+        columns["close"][ends].tolist(),
+        np.add.reduceat(columns["volumefrom"], starts).tolist(),
+        np.add.reduceat(columns["volumeto"], starts).tolist(),
+    )
+    return [dict(zip(CANDLE_FIELDS, bar)) for bar in bars]
+
+
+def _resample_python(candles, size, offset):
+    bars = []
+    current_key = None
+    for c in candles:
+        key = (int(c["time"]) - offset) // size
+        if key != current_key:
+            current_key = key
+            bars.append({
+                "time": key * size + offset,
+                "open": c["open"] or 0,
+                "high": c["high"] or 0,
+                "low": c["low"] or 0,
+                "close": c["close"] or 0,
+                "volumefrom": c["volumefrom"] or 0,
+                "volumeto": c["volumeto"] or 0,
+            })
+            continue
+        bar = bars[-1]
+        bar["high"] = max(bar["high"], c["high"] or 0)
+        bar["low"] = min(bar["low"], c["low"] or 0)
+        bar["close"] = c["close"] or 0
+        bar["volumefrom"] += c["volumefrom"] or 0
+        bar["volumeto"] += c["volumeto"] or 0
+    return bars
+
+
+def lttb(candles, points: int) -> list:
+    """Largest-Triangle-Three-Buckets downsampling on (time, close), keeping whole candles"""
+    n = len(candles)
+    if points >= n or points < 3:
+        return list(candles)
+    if np is None:
+        return [candles[i] for i in _lttb_python(candles, points)]
+
+    x = np.array([c["time"] for c in candles], dtype=np.float64)
+    y = np.array([c["close"] or 0 for c in candles], dtype=np.float64)
+    # Bucket edges for the n - 2 interior points
+    edges = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+
+    selected = [0]
+    a = 0
+    for b in range(points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Average of the next bucket, or the last point for the final bucket
+        nx, ny = (avg_x[b + 1], avg_y[b + 1]) if b + 1 < points - 2 else (x[-1], y[-1])
+        areas = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(np.argmax(areas))
+        selected.append(a)
+    selected.append(n - 1)
+    return [candles[i] for i in selected]
+
+
+def _lttb_python(candles, points):
+    n = len(candles)
+    x = [c["time"] for c in candles]
+    y = [c["close"] or 0 for c in candles]
+    every = (n - 2) / (points - 2)
+    edges = [int(i * every) + 1 for i in range(points - 1)]
+    edges[-1] = n - 1
+
+    selected = [0]
+    a = 0
+    for b in range(points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < points - 2:
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            nx = sum(x[nlo:nhi]) / (nhi - nlo)
+            ny = sum(y[nlo:nhi]) / (nhi - nlo)
+        else:
+            nx, ny = x[-1], y[-1]
+        best, best_area = lo, -1.0
+        for i in range(lo, hi):
+            area = abs((x[a] - nx) * (y[i] - y[a]) - (x[a] - x[i]) * (ny - y[a]))
+            if area > best_area:
+                best, best_area = i, area
+        a = best
+        selected.append(a)
+    selected.append(n - 1)
+    return selected
+
+
+class AggregateCache:
+    """Small LRU cache with TTL for aggregated chart payloads"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,176 @@
+"""Frontend asset pipeline: fingerprinting, precompression and cache-aware serving
+
+`python -m backend.assets` builds frontend/ into build/frontend/. Stylesheets and
+scripts get content-hashed names (styles.<hash>.css), HTML references are
+rewritten to match, and every text asset gets .gz and, when the brotli module is
+installed, .br variants. AssetFiles serves the build: it picks a precompressed
+variant from Accept-Encoding, marks hashed assets immutable for a year and
+keeps HTML on no-cache so new deploys are picked up immediately. Without a
+build it serves frontend/ as-is with no-cache on everything.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import sys
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SOURCE_DIR = "frontend"
+BUILD_DIR = os.path.join("build", "frontend")
+MANIFEST = "manifest.json"
+
+FINGERPRINTED = (".css", ".js")
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # in order of preference
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+NO_CACHE = "no-cache"
+SHORT_CACHE = "public, max-age=3600"
+
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[A-Za-z0-9]+$")
+REFERENCE = re.compile(r"""(?P<prefix>(?:href|src)=["'])(?P<slash>/?)(?P<path>[^"'?#]+)""")
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def rewrite_references(html: str, manifest: dict) -> str:
+    def replace(match):
+        hashed = manifest.get(match.group("path"))
+        if hashed is None:
+            return match.group(0)
+        return match.group("prefix") + match.group("slash") + hashed
+    return REFERENCE.sub(replace, html)
+
+
+def compress(path: str, data: bytes) -> list:
+    """Write .gz/.br variants next to `path` when they are smaller; returns the suffixes written"""
+    written = []
+    variants = [(".gz", gzip.compress(data, 9, mtime=0))]
+    if brotli:
+        variants.insert(0, (".br", brotli.compress(data, quality=11)))
+    for suffix, encoded in variants:
+        if len(encoded) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(encoded)
+            written.append(suffix)
+    return written
+
+
+def build(source: str = SOURCE_DIR, output: str = BUILD_DIR) -> dict:
+    """Build fingerprinted, precompressed assets; returns the source -> hashed name manifest"""
+    files = {}
+    for root, _, names in os.walk(source):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, source).replace(os.sep, "/")] = f.read()
+
+    manifest = {
+        name: fingerprint(name, data)
+        for name, data in files.items()
+        if name.endswith(FINGERPRINTED)
+    }
+
+    shutil.rmtree(output, ignore_errors=True)
+    for name, data in files.items():
+        if name.endswith(".html"):
+            data = rewrite_references(data.decode(), manifest).encode()
+        target = os.path.join(output, manifest.get(name, name))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        if name.endswith(COMPRESSIBLE):
+            compress(target, data)
+
+    with open(os.path.join(output, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def accepted_encodings(scope) -> set:
+    accepted = set()
+    for item in Headers(scope=scope).get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles with precompressed variants and per-asset Cache-Control"""
+
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.built = os.path.isfile(os.path.join(directory, MANIFEST))
+        # Built assets never change while the process runs, so look variants up once
+        self.variants = {}  # real path -> [(encoding, variant path, stat)]
+        if self.built:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    path = os.path.realpath(os.path.join(root, name))
+                    found = []
+                    for encoding, suffix in ENCODINGS:
+                        if name + suffix in names:
+                            variant = path + suffix
+                            found.append((encoding, variant, os.stat(variant)))
+                    if found:
+                        self.variants[path] = found
+
+    def cache_control(self, path: str) -> str:
+        if not self.built or path.endswith(".html"):
+            return NO_CACHE
+        if HASHED_NAME.search(path):
+            return IMMUTABLE
+        return SHORT_CACHE
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        full_path = os.path.realpath(full_path)
+        headers = {"Cache-Control": self.cache_control(full_path)}
+        response = None
+        variants = self.variants.get(full_path)
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(scope)
+            for encoding, variant, variant_stat in variants:
+                if encoding in accepted:
+                    headers["Content-Encoding"] = encoding
+                    media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+                    response = FileResponse(variant, status_code=status_code, stat_result=variant_stat,
+                                            media_type=media_type, headers=headers)
+                    break
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def static_directory() -> str:
+    """The built asset directory when a build exists, otherwise the raw frontend sources"""
+    if os.path.isfile(os.path.join(BUILD_DIR, MANIFEST)):
+        return BUILD_DIR
+    return SOURCE_DIR
+
+
+if __name__ == "__main__":
+    manifest = build(*sys.argv[1:3])
+    for name, hashed in sorted(manifest.items()):
+        print(f"{name} -> {hashed}")
+    if brotli is None:
+        print("brotli not installed: wrote gzip variants only")
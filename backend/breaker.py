@@ -0,0 +1,154 @@
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SLOW_LATENCY = 2.0  # seconds; a provider slower than this at p50 loses its preference
+
+
+class CircuitOpen(Exception):
+    """Raised when a provider is skipped because its circuit is open"""
+
+
+class CircuitBreaker:
+    """Per-provider circuit breaker over a rolling window of request outcomes
+
+    The window holds the last `window` outcomes no older than `window_seconds`, so
+    a provider that failed once recovers its standing even if it isn't retried.
+    The circuit opens after `failure_threshold` consecutive failures, or when the
+    error rate over the window reaches `error_rate_threshold`. After `open_seconds`
+    it half-opens and lets a single probe through; the probe's outcome closes the
+    circuit again or re-opens it.
+    """
+
+    def __init__(self, name: str, window: int = 20, window_seconds: float = 300.0,
+                 failure_threshold: int = 3, error_rate_threshold: float = 0.5,
+                 open_seconds: float = 30.0):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.open_seconds = open_seconds
+        self.outcomes = deque(maxlen=window)  # (timestamp, ok, latency)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.times_opened = 0
+
+    def available(self) -> bool:
+        """Whether a request would currently be let through (does not claim a probe)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        return not self.probe_in_flight
+
+    def allow(self) -> bool:
+        """Claim permission to send a request; in half-open state only one probe at a time"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def release(self):
+        """Give back a claimed probe when the request never reached the provider"""
+        self.probe_in_flight = False
+
+    def record_success(self, latency: float):
+        self.outcomes.append((time.monotonic(), True, latency))
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != CLOSED:
+            print(f"{self.name} circuit closed")
+            self.state = CLOSED
+
+    def record_failure(self, latency: float = 0.0):
+        self.outcomes.append((time.monotonic(), False, latency))
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold or (
+            len(self._recent()) >= self.failure_threshold and self.error_rate() >= self.error_rate_threshold
+        ):
+            self._open()
+
+    def _open(self):
+        if self.state != OPEN:
+            print(f"{self.name} circuit opened")
+            self.times_opened += 1
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def _recent(self) -> list:
+        cutoff = time.monotonic() - self.window_seconds
+        return [(ok, latency) for ts, ok, latency in self.outcomes if ts >= cutoff]
+
+    def error_rate(self) -> float:
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return sum(1 for ok, _ in recent if not ok) / len(recent)
+
+    def latency_percentile(self, q: float):
+        """Latency of successful requests at percentile q (0-100), or None without data"""
+        latencies = sorted(latency for ok, latency in self._recent() if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(q / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def stats(self) -> dict:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "latency_p50": round(p50, 3) if p50 is not None else None,
+            "latency_p95": round(p95, 3) if p95 is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class LatencyWindow:
+    """Durations of the last `size` successful operations of one kind"""
+
+    def __init__(self, size: int = 50):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float):
+        """Duration at percentile q (0-100), or None without data"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class ProviderRouter:
+    """Orders providers healthiest-first, skipping any whose circuit is open"""
+
+    def __init__(self, breakers: dict):
+        self.breakers = breakers
+
+    def order(self, providers) -> list:
+        """Available providers sorted by health; `providers` order breaks ties"""
+        preference = {name: index for index, name in enumerate(providers)}
+
+        def health_key(name):
+            breaker = self.breakers[name]
+            p50 = breaker.latency_percentile(50)
+            slow = p50 is not None and p50 >= SLOW_LATENCY
+            return (breaker.state != CLOSED, round(breaker.error_rate(), 1), slow, preference[name])
+
+        return sorted((name for name in providers if self.breakers[name].available()), key=health_key)
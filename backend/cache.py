@@ -0,0 +1,239 @@
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class ResponseCache:
+    """TTL cache with stale-while-revalidate for upstream-backed endpoints
+
+    Within `ttl` an entry is served as a fresh hit. Within `ttl + stale_ttl` it is
+    served immediately while a single background refresh runs. Past that the
+    caller waits for the loader. If a load fails, any previous value is served
+    regardless of age so a provider outage never empties the dashboard.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.metrics = {}
+        self._refreshing = {}
+
+    def _metrics(self, key: str) -> dict:
+        metrics = self.metrics.get(key)
+        if metrics is None:
+            metrics = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+            self.metrics[key] = metrics
+        return metrics
+
+    def peek(self, key: str):
+        """Return the cached value without touching metrics or triggering a refresh"""
+        entry = self.entries.get(key)
+        return entry.value if entry else None
+
+    def age(self, key: str):
+        entry = self.entries.get(key)
+        return time.monotonic() - entry.fetched_at if entry else None
+
+    def set(self, key: str, value):
+        self.entries[key] = CacheEntry(value, time.monotonic())
+
+    async def get(self, key: str, loader, ttl: float, stale_ttl: float = 0):
+        metrics = self._metrics(key)
+        entry = self.entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < ttl:
+                metrics["hits"] += 1
+                return entry.value
+            if age < ttl + stale_ttl:
+                metrics["stale_hits"] += 1
+                self._refresh_in_background(key, loader)
+                return entry.value
+
+        metrics["misses"] += 1
+        try:
+            return await self.refresh(key, loader)
+        except Exception:
+            if entry is not None:
+                print(f"Serving cached {key} after failed refresh")
+                return entry.value
+            raise
+
+    async def refresh(self, key: str, loader):
+        """Reload a key now; concurrent refreshes of the same key share one load"""
+        task = self._refreshing.get(key) or self._start(key, loader)
+        return await asyncio.shield(task)
+
+    def _refresh_in_background(self, key: str, loader):
+        if key not in self._refreshing:
+            self._start(key, loader)
+
+    def _start(self, key: str, loader) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, loader))
+        task.add_done_callback(_retrieve_exception)
+        self._refreshing[key] = task
+        return task
+
+    async def _load(self, key: str, loader):
+        metrics = self._metrics(key)
+        try:
+            value = await loader()
+            self.set(key, value)
+            metrics["refreshes"] += 1
+            return value
+        except Exception as e:
+            metrics["errors"] += 1
+            print(f"Cache refresh of {key} failed: {e}")
+            raise
+        finally:
+            self._refreshing.pop(key, None)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        result = {}
+        for key, metrics in self.metrics.items():
+            entry = self.entries.get(key)
+            result[key] = {
+                **metrics,
+                "age_seconds": round(now - entry.fetched_at, 3) if entry else None,
+            }
+        return result
+
+
+
+class SizedEntry:
+    __slots__ = ("value", "size", "fetched_at")
+
+    def __init__(self, value, size: int, fetched_at: float):
+        self.value = value
+        self.size = size
+        self.fetched_at = fetched_at
+
+
+class DetailCache:
+    """Byte-bounded cache for many small per-key responses (one per coin)
+
+    Entries live for `ttl`, are served stale for up to `stale_ttl` more while
+    one background reload runs, and are kept past that if a reload fails. The
+    total of entry sizes stays under `max_bytes`: eviction looks at the
+    `sample` least recently used entries and drops the least frequently
+    requested of them, so one scan over many cold coins cannot push out the
+    popular ones. Request counts outlive evictions and are halved by decay(),
+    which lets hot() name the coins worth keeping warm.
+    """
+
+    def __init__(self, max_bytes: int, sizeof=len, sample: int = 5):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.sample = sample
+        self.entries = OrderedDict()  # key -> SizedEntry, least recently used first
+        self.frequency = {}  # key -> decayed request count
+        self.bytes = 0
+        self.metrics = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0, "evictions": 0}
+        self._refreshing = {}
+
+    def age(self, key):
+        entry = self.entries.get(key)
+        return time.monotonic() - entry.fetched_at if entry else None
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+        if size > self.max_bytes:
+            return
+        self.entries[key] = SizedEntry(value, size, time.monotonic())
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        candidates = []
+        for key in self.entries:
+            candidates.append(key)
+            if len(candidates) >= self.sample:
+                break
+        victim = min(candidates, key=lambda key: self.frequency.get(key, 0))
+        self.bytes -= self.entries.pop(victim).size
+        self.metrics["evictions"] += 1
+
+    async def get(self, key, loader, ttl: float, stale_ttl: float = 0):
+        self.frequency[key] = self.frequency.get(key, 0) + 1
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            age = time.monotonic() - entry.fetched_at
+            if age < ttl:
+                self.metrics["hits"] += 1
+                return entry.value
+            if age < ttl + stale_ttl:
+                self.metrics["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._start(key, loader)
+                return entry.value
+
+        self.metrics["misses"] += 1
+        try:
+            return await self.refresh(key, loader)
+        except Exception:
+            if entry is not None and key in self.entries:
+                print(f"Serving cached {key} after failed refresh")
+                return entry.value
+            raise
+
+    async def refresh(self, key, loader):
+        """Reload a key now without counting a request; concurrent reloads share one load"""
+        task = self._refreshing.get(key) or self._start(key, loader)
+        return await asyncio.shield(task)
+
+    def _start(self, key, loader) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, loader))
+        task.add_done_callback(_retrieve_exception)
+        self._refreshing[key] = task
+        return task
+
+    async def _load(self, key, loader):
+        try:
+            value = await loader()
+            self.set(key, value)
+            self.metrics["refreshes"] += 1
+            return value
+        except Exception as e:
+            self.metrics["errors"] += 1
+            print(f"Cache refresh of {key} failed: {e}")
+            raise
+        finally:
+            self._refreshing.pop(key, None)
+
+    def hot(self, count: int) -> list:
+        """The `count` most requested keys"""
+        return heapq.nlargest(count, self.frequency, key=self.frequency.get)
+
+    def decay(self):
+        """Halve every request count and forget keys that are no longer requested"""
+        self.frequency = {key: hits / 2 for key, hits in self.frequency.items() if hits >= 1}
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "tracked": len(self.frequency),
+        }
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Failures are logged in _load; mark them retrieved so unawaited
+    # background refreshes don't warn at garbage collection
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,158 @@
+import asyncio
+from typing import Dict, Set
+
+from fastapi import WebSocket
+
+from backend.serialization import TEXT, Payload
+
+# Outbound queue per client, shared by all of its topics. When a slow client
+# overflows it the oldest message is dropped; price clients notice the seq gap
+# and ask for a resync.
+SEND_QUEUE_SIZE = 8
+SEND_TIMEOUT = 5.0  # seconds a single send may take before the client is evicted
+
+
+class ClientConnection:
+    """One WebSocket client with its own bounded outbound queue and writer task"""
+
+    __slots__ = ("websocket", "queue", "writer", "dropped", "topics", "format")
+
+    def __init__(self, websocket: WebSocket, queue_size: int, fmt: str = TEXT):
+        self.websocket = websocket
+        self.format = fmt
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.writer = None
+        self.dropped = 0
+        self.topics = set()
+
+    def enqueue(self, message) -> bool:
+        """Queue a message without blocking, dropping the oldest one if the client is behind"""
+        dropped = False
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+                dropped = True
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(message)
+        return dropped
+
+
+class ConnectionManager:
+    """WebSocket fan-out with per-client queues and slow-consumer eviction
+
+    Clients subscribe to topics; publish() walks only the subscriber set of
+    one topic, so an update costs O(interested clients) rather than O(all).
+    """
+
+    def __init__(self, queue_size: int = SEND_QUEUE_SIZE, send_timeout: float = SEND_TIMEOUT):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.topics: Dict[str, Set[WebSocket]] = {}
+        self.messages_dropped = 0
+        self.clients_evicted = 0
+
+    async def connect(self, websocket: WebSocket, topics=(), fmt: str = TEXT):
+        await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size, fmt)
+        self.active_connections[websocket] = client
+        for topic in topics:
+            self.subscribe(websocket, topic)
+        client.writer = asyncio.create_task(self._writer(client))
+
+    def disconnect(self, websocket: WebSocket):
+        client = self._remove(websocket)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    def _remove(self, websocket: WebSocket):
+        client = self.active_connections.pop(websocket, None)
+        if client:
+            for topic in client.topics:
+                self._discard(topic, websocket)
+            client.topics.clear()
+        return client
+
+    def _discard(self, topic: str, websocket: WebSocket):
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.topics[topic]
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        client = self.active_connections.get(websocket)
+        if client:
+            client.topics.add(topic)
+            self.topics.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        client = self.active_connections.get(websocket)
+        if client:
+            client.topics.discard(topic)
+            self._discard(topic, websocket)
+
+    def subscriptions(self, websocket: WebSocket) -> set:
+        client = self.active_connections.get(websocket)
+        return set(client.topics) if client else set()
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self.topics.get(topic, ()))
+
+    def send(self, websocket: WebSocket, message):
+        """Queue a payload for a single client"""
+        client = self.active_connections.get(websocket)
+        if client and client.enqueue(message):
+            self.messages_dropped += 1
+
+    def publish(self, topic: str, message) -> int:
+        """Queue a payload for the subscribers of one topic
+
+        A Payload is encoded by the writers, once per wire format in use, so
+        every subscriber shares the same serialized bytes.
+        """
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return 0
+        for websocket in subscribers:
+            client = self.active_connections[websocket]
+            if client.enqueue(message):
+                self.messages_dropped += 1
+        return len(subscribers)
+
+    async def _writer(self, client: ClientConnection):
+        websocket = client.websocket
+        try:
+            while True:
+                message = await client.queue.get()
+                if isinstance(message, Payload):
+                    message = message.encode(client.format)
+                send = websocket.send_text if isinstance(message, str) else websocket.send_bytes
+                await asyncio.wait_for(send(message), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            print("Evicting slow WebSocket client: send deadline exceeded")
+            await self._evict(client)
+        except Exception as e:
+            print(f"Evicting WebSocket client after send error: {e}")
+            await self._evict(client)
+
+    async def _evict(self, client: ClientConnection):
+        if self._remove(client.websocket) is None:
+            return
+        self.clients_evicted += 1
+        try:
+            await asyncio.wait_for(client.websocket.close(code=1013), 1.0)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self.active_connections),
+            "topics": {topic: len(subscribers) for topic, subscribers in self.topics.items()},
+            "messages_dropped": self.messages_dropped,
+            "clients_evicted": self.clients_evicted,
+        }
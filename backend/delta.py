@@ -0,0 +1,95 @@
+_MISSING = object()
+
+
+def diff_markets(previous, current) -> dict:
+    """Field-level changes between two market lists keyed by coin id
+
+    Returns {"changes": {id: {field: value}}, "removed": [ids], "order": [ids] or
+    None}. A coin new to the list appears in `changes` with all of its fields;
+    `order` is only present when membership or ranking changed.
+    """
+    before = {coin.get("id"): coin for coin in previous}
+    changes = {}
+    for coin in current:
+        coin_id = coin.get("id")
+        old = before.get(coin_id)
+        if old is None:
+            changes[coin_id] = coin
+            continue
+        fields = {key: value for key, value in coin.items() if old.get(key, _MISSING) != value}
+        if fields:
+            changes[coin_id] = fields
+
+    current_ids = [coin.get("id") for coin in current]
+    previous_ids = [coin.get("id") for coin in previous]
+    present = set(current_ids)
+    return {
+        "changes": changes,
+        "removed": [coin_id for coin_id in previous_ids if coin_id not in present],
+        "order": current_ids if current_ids != previous_ids else None,
+    }
+
+
+class PriceStream:
+    """One delta-encoded price feed: a coin selection plus a minimum push interval
+
+    Clients with the same symbol filter and rate share a stream, so each update
+    is diffed and serialized once per stream rather than once per socket. With
+    no symbols the stream follows the top `size` coins by market cap.
+    """
+
+    def __init__(self, topic: str, encode, symbols=None, interval: float = 0, size: int = 20):
+        self.topic = topic
+        self.encode = encode
+        self.symbols = frozenset(symbols) if symbols else None
+        self.interval = interval
+        self.size = size
+        self.seq = 0
+        self.coins = []
+        self.published_at = 0.0
+        self._snapshot = None  # (seq, serialized snapshot)
+
+    def select(self, markets) -> list:
+        """Coin dicts for this stream from a MarketSnapshot; only the selected rows are built"""
+        if self.symbols is None:
+            return markets[:self.size].to_list()
+        ids = markets.values("id")
+        symbols = markets.values("symbol")
+        return [
+            markets[index] for index in range(len(markets))
+            if ids[index] in self.symbols or (symbols[index] or "").lower() in self.symbols
+        ]
+
+    def update(self, markets, now: float):
+        """Advance the stream; returns the serialized message to publish, or None"""
+        if self.interval and now - self.published_at < self.interval:
+            return None
+        coins = self.select(markets)
+        if not self.seq:
+            self.seq = 1
+            self.coins = coins
+            self.published_at = now
+            return self.snapshot_message()
+
+        delta = diff_markets(self.coins, coins)
+        if not (delta["changes"] or delta["removed"] or delta["order"]):
+            return None
+        self.seq += 1
+        self.coins = coins
+        self.published_at = now
+        message = {"type": "price_delta", "seq": self.seq, "base": self.seq - 1, "changes": delta["changes"]}
+        if delta["removed"]:
+            message["removed"] = delta["removed"]
+        if delta["order"]:
+            message["order"] = delta["order"]
+        return self.encode(message)
+
+    def snapshot_message(self):
+        """Serialized full snapshot for the current seq, built at most once per seq"""
+        if self._snapshot is None or self._snapshot[0] != self.seq:
+            self._snapshot = (self.seq, self.encode({
+                "type": "price_update",
+                "seq": self.seq,
+                "data": self.coins
+            }))
+        return self._snapshot[1]
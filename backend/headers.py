@@ -0,0 +1,81 @@
+"""Response header injection as a pure ASGI middleware
+
+Security headers and Cache-Control values are encoded to bytes once at startup
+and appended to the raw header list of each response start message, so there
+is no per-request task, body wrapping or header re-parsing as with
+BaseHTTPMiddleware, and streaming responses pass straight through.
+"""
+
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "SAMEORIGIN",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Permissions-Policy": "accelerometer=(), camera=(), geolocation=(), gyroscope=(), magnetometer=(), microphone=(), payment=(), usb=()",
+}
+
+NO_STORE = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
+
+CACHEABLE_STATUS = (200, 203, 204, 206, 304)
+
+
+def encode_headers(headers: dict) -> list:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+class HeaderMiddleware:
+    """Adds security headers and a per-route Cache-Control to every HTTP response
+
+    `policies` maps a path, or a path prefix ending in "/", to a Cache-Control
+    value; the longest match wins. A policy only applies to successful
+    responses that did not set Cache-Control themselves. Responses with no
+    policy and no Cache-Control of their own (errors, unlisted API routes) get
+    `default`, which is no-store.
+    """
+
+    def __init__(self, app, policies: dict = None, default: dict = NO_STORE):
+        self.app = app
+        self.security = encode_headers(SECURITY_HEADERS)
+        self.default = encode_headers(default)
+        self.exact = {}
+        self.prefixes = []
+        for path, value in (policies or {}).items():
+            headers = encode_headers({"Cache-Control": value})
+            if path.endswith("/"):
+                self.prefixes.append((path, headers))
+            else:
+                self.exact[path] = headers
+        self.prefixes.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def policy(self, path: str):
+        headers = self.exact.get(path)
+        if headers is not None:
+            return headers
+        for prefix, headers in self.prefixes:
+            if path.startswith(prefix):
+                return headers
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy = self.policy(scope["path"])
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if not any(name == b"cache-control" for name, _ in headers):
+                    if policy is not None and message["status"] in CACHEABLE_STATUS:
+                        headers.extend(policy)
+                    else:
+                        headers.extend(self.default)
+                headers.extend(self.security)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
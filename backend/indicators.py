@@ -0,0 +1,206 @@
+"""Technical indicators over sparkline price series
+
+The single-series functions are the reference implementations. batch_indicators
+computes the same values for many series at once: with NumPy it runs one
+vectorized pass per sparkline length, accumulating window sums column by column
+in the same order as the pure-Python code so both paths produce identical floats.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RSI_PERIOD = 14
+STOCH_PERIOD = 14
+BB_PERIOD = 20
+BB_STD_DEV = 2
+MACD_FAST = 12
+MACD_SLOW = 26
+
+INDICATOR_FIELDS = (
+    "rsi", "stochastic", "macd",
+    "bollinger_upper", "bollinger_middle", "bollinger_lower",
+    "high", "low",
+)
+
+
+def calculate_rsi(prices, period=14):
+    """Calculate RSI from price data"""
+    if len(prices) < period:
+        return 50
+
+    changes = [prices[i] - prices[i-1] for i in range(1, len(prices))]
+    gains = [c if c > 0 else 0 for c in changes[-period:]]
+    losses = [-c if c < 0 else 0 for c in changes[-period:]]
+
+    avg_gain = sum(gains) / period if gains else 0
+    avg_loss = sum(losses) / period if losses else 0
+
+    if avg_loss == 0:
+        return 100 if avg_gain > 0 else 50
+
+    rs = avg_gain / avg_loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+def calculate_macd(prices, fast=12, slow=26, signal=9):
+    """Calculate MACD line and signal"""
+    if len(prices) < slow:
+        return None, None
+
+    ema_fast = prices[-1]
+    ema_slow = prices[-1]
+
+    for price in prices[-slow:]:
+        ema_slow = ema_slow * (1 - 2/(slow+1)) + price * (2/(slow+1))
+
+    for price in prices[-fast:]:
+        ema_fast = ema_fast * (1 - 2/(fast+1)) + price * (2/(fast+1))
+
+    macd = ema_fast - ema_slow
+    return macd, macd
+
+
+def calculate_bollinger_bands(prices, period=20, std_dev=2):
+    """Calculate Bollinger Bands"""
+    if len(prices) < period:
+        return None, None, None
+
+    recent_prices = prices[-period:]
+    sma = sum(recent_prices) / period
+    variance = sum((p - sma) ** 2 for p in recent_prices) / period
+    std = variance ** 0.5
+
+    upper = sma + (std_dev * std)
+    lower = sma - (std_dev * std)
+    return upper, sma, lower
+
+
+def calculate_stochastic(prices, period=14):
+    """Calculate Stochastic RSI"""
+    if len(prices) < period:
+        return 50
+
+    recent = prices[-period:]
+    low = min(recent)
+    high = max(recent)
+
+    if high == low:
+        return 50
+
+    stoch = ((prices[-1] - low) / (high - low)) * 100
+    return stoch
+
+
+def compute_indicators(prices):
+    """All indicators used by signal analysis for one non-empty price series
+
+    `rsi` is None when the series is shorter than the RSI period so callers can
+    substitute their own estimate.
+    """
+    macd, _ = calculate_macd(prices, MACD_FAST, MACD_SLOW)
+    upper, middle, lower = calculate_bollinger_bands(prices, BB_PERIOD, BB_STD_DEV)
+    return {
+        "rsi": calculate_rsi(prices, RSI_PERIOD) if len(prices) >= RSI_PERIOD else None,
+        "stochastic": calculate_stochastic(prices, STOCH_PERIOD),
+        "macd": macd,
+        "bollinger_upper": upper,
+        "bollinger_middle": middle,
+        "bollinger_lower": lower,
+        "high": max(prices),
+        "low": min(prices),
+    }
+
+
+def batch_indicators(series_list):
+    """compute_indicators for many price series at once, in input order"""
+    if np is None:
+        return [compute_indicators(prices) for prices in series_list]
+
+    # Sparklines from one provider share a length, so this is usually one group
+    groups = {}
+    for index, prices in enumerate(series_list):
+        groups.setdefault(len(prices), []).append(index)
+
+    results = [None] * len(series_list)
+    for length, indexes in groups.items():
+        matrix = np.array([series_list[i] for i in indexes], dtype=np.float64)
+        for i, row in zip(indexes, _batch_group(matrix, length)):
+            results[i] = row
+    return results
+
+
+def _window_sum(columns):
+    # Left-to-right accumulation, matching Python's sum() order exactly
+    total = np.zeros(columns.shape[0])
+    for j in range(columns.shape[1]):
+        total = total + columns[:, j]
+    return total
+
+
+def _batch_group(matrix, length):
+    count = matrix.shape[0]
+    last = matrix[:, -1]
+
+    # RSI over the last `period` price changes
+    if length >= RSI_PERIOD:
+        changes = np.diff(matrix[:, -(RSI_PERIOD + 1):], axis=1)
+        gains = _window_sum(np.where(changes > 0, changes, 0.0))
+        losses = _window_sum(np.where(changes < 0, -changes, 0.0))
+        avg_gain = gains / RSI_PERIOD
+        avg_loss = losses / RSI_PERIOD
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+    else:
+        rsi = None
+
+    # Stochastic position within the recent range
+    if length >= STOCH_PERIOD:
+        recent = matrix[:, -STOCH_PERIOD:]
+        low = recent.min(axis=1)
+        high = recent.max(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stoch = ((last - low) / (high - low)) * 100
+        stoch = np.where(high == low, 50.0, stoch)
+    else:
+        stoch = np.full(count, 50.0)
+
+    # Bollinger bands
+    if length >= BB_PERIOD:
+        recent = matrix[:, -BB_PERIOD:]
+        sma = _window_sum(recent) / BB_PERIOD
+        variance = _window_sum((recent - sma[:, None]) ** 2) / BB_PERIOD
+        std = variance ** 0.5
+        upper = sma + (BB_STD_DEV * std)
+        lower = sma - (BB_STD_DEV * std)
+    else:
+        upper = sma = lower = None
+
+    # MACD, seeded from the latest price like calculate_macd
+    if length >= MACD_SLOW:
+        ema_slow = last.copy()
+        for j in range(length - MACD_SLOW, length):
+            ema_slow = ema_slow * (1 - 2/(MACD_SLOW+1)) + matrix[:, j] * (2/(MACD_SLOW+1))
+        ema_fast = last.copy()
+        for j in range(length - MACD_FAST, length):
+            ema_fast = ema_fast * (1 - 2/(MACD_FAST+1)) + matrix[:, j] * (2/(MACD_FAST+1))
+        macd = ema_fast - ema_slow
+    else:
+        macd = None
+
+    # tolist() converts each column to Python floats in one call
+    empty = [None] * count
+    columns = zip(
+        rsi.tolist() if rsi is not None else empty,
+        stoch.tolist(),
+        macd.tolist() if macd is not None else empty,
+        upper.tolist() if upper is not None else empty,
+        sma.tolist() if sma is not None else empty,
+        lower.tolist() if lower is not None else empty,
+        matrix.max(axis=1).tolist(),
+        matrix.min(axis=1).tolist(),
+    )
+    return [dict(zip(INDICATOR_FIELDS, values)) for values in columns]
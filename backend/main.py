@@ -1,35 +1,73 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 import httpx
 import asyncio
-from typing import List
+import hashlib
+import json
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import time
+from typing import NamedTuple
+
+from backend.aggregate import AggregateCache, TIMEFRAMES, lttb, resample
+from backend.assets import AssetFiles, static_directory
+from backend.breaker import CircuitBreaker, CircuitOpen, LatencyWindow, ProviderRouter
+from backend.cache import DetailCache, ResponseCache
+from backend.connections import ConnectionManager
+from backend.delta import PriceStream
+from backend.headers import HeaderMiddleware
+from backend.indicators import batch_indicators, compute_indicators
+from backend.markets import SORT_FIELDS, MarketSnapshot, MarketTable, fetch_pages
+from backend.normalize import (coinstats_coin_details, cryptocompare_coin_details, map_coinstats_market,
+                               map_cryptocompare_market, normalize_markets, ohlc_response, points_to_candles,
+                               select_candles)
+from backend.ratelimit import TokenBucket, RateLimitExceeded, request_priority, PRIORITY_REALTIME, PRIORITY_ADHOC
+from backend.registry import RECORD_FIELDS, CoinRegistry
+from backend.serialization import JSON, FastJSONResponse, Payload, dumps_bytes, etag_matches, loads, websocket_format
+from backend.singleflight import SingleFlight
+from backend.state import create_state
+from backend.streaming import IndicatorBook
+from backend.transport import UpstreamClients
+from backend.tsdb import CandleStore
 
 load_dotenv()
 
-app = FastAPI(title="Krypticks API")
-
-# No-cache middleware for fresh files + SEO headers
-class NoCacheMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        # SEO & Performance Headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "SAMEORIGIN"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "accelerometer=(), camera=(), geolocation=(), gyroscope=(), magnetometer=(), microphone=(), payment=(), usb=()"
-        return response
-
-app.add_middleware(NoCacheMiddleware)
+@asynccontextmanager
+async def lifespan(app):
+    global candle_store
+    candle_store = CandleStore(OHLC_DB_PATH)
+    await upstream.start()
+    await state.start()
+    await state.subscribe(MARKETS_CHANNEL, on_markets_update)
+    start_market_refresh()
+    start_coin_refresh()
+    yield
+    await stop_coin_refresh()
+    await stop_market_refresh()
+    await state.close()
+    await upstream.close()
+    candle_store.close()
+
+app = FastAPI(title="Krypticks API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Cache-Control per route (a trailing "/" matches the prefix) so browsers and CDNs can
+# absorb repeat reads; anything unlisted without its own Cache-Control is no-store.
+# Static assets set their own policy (see backend/assets.py).
+CACHE_POLICIES = {
+    "/api/health": "no-store",
+    "/api/markets": "public, max-age=15",
+    "/api/search": "public, max-age=60",
+    "/api/global": "public, max-age=60",
+    "/api/fear-greed": "public, max-age=300",
+    "/api/coin/": "public, max-age=30",
+    "/api/ohlc/": "public, max-age=60",
+    "/api/vip/": "private, no-cache",
+}
+
+# Security/SEO headers and cache policies, added by a pure ASGI middleware
+app.add_middleware(HeaderMiddleware, policies=CACHE_POLICIES)
 
 # CORS configuration
 app.add_middleware(
@@ -38,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
 # API Keys (using environment variables)
@@ -45,324 +84,563 @@ COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY", "")
 CRYPTOCOMPARE_API_KEY = os.getenv("CRYPTOCOMPARE_API_KEY", "")
 COINSTATS_API_KEY = os.getenv("COINSTATS_API_KEY", "")
 
-# Shared async HTTP client
-http_client = httpx.AsyncClient(timeout=10.0)
-
-# Rate limiting
-last_coingecko_call = 0
-last_cryptocompare_call = 0
-last_coinstats_call = 0
-COINGECKO_RATE_LIMIT = 1.2  # seconds between calls
-CRYPTOCOMPARE_RATE_LIMIT = 0.6  # seconds between calls
-COINSTATS_RATE_LIMIT = 0.5  # seconds between calls
-
-# Cache for rate limit and failure fallback
-cached_markets = None
-cached_global = None
-cached_fear_greed = None
-
-# Track which APIs are working
-coingecko_working = True
-cryptocompare_working = True
-coinstats_working = True
-
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+# Upstream HTTP transport: one pooled client per provider, opened and closed with the app
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10.0"))  # also the longest wait for a rate-limit token
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.0"))
+UPSTREAM_POOL_TIMEOUT = float(os.getenv("UPSTREAM_POOL_TIMEOUT", "2.0"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "1").lower() in ("1", "true", "yes")
+UPSTREAM_CLIENTS = {
+    "coingecko": {"max_connections": 10, "max_keepalive_connections": 5, "keepalive_expiry": 30.0, "http2": UPSTREAM_HTTP2},
+    "cryptocompare": {"max_connections": 10, "max_keepalive_connections": 5, "keepalive_expiry": 30.0, "http2": UPSTREAM_HTTP2},
+    "coinstats": {"max_connections": 5, "max_keepalive_connections": 2, "keepalive_expiry": 30.0, "http2": UPSTREAM_HTTP2},
+    "alternative": {"max_connections": 2, "max_keepalive_connections": 1, "keepalive_expiry": 60.0, "http2": False},
+}
+upstream = UpstreamClients(UPSTREAM_CLIENTS, httpx.Timeout(
+    UPSTREAM_TIMEOUT,
+    connect=UPSTREAM_CONNECT_TIMEOUT,
+    pool=UPSTREAM_POOL_TIMEOUT,
+))
 
+# Rate limiting: one token bucket per provider (requests per second, burst)
+rate_limiters = {
+    "coingecko": TokenBucket("coingecko", rate=1 / 1.2, burst=3),
+    "cryptocompare": TokenBucket("cryptocompare", rate=1 / 0.6, burst=5),
+    "coinstats": TokenBucket("coinstats", rate=1 / 0.5, burst=5),
+    "alternative": TokenBucket("alternative", rate=1.0, burst=2),
+}
+
+# Circuit breakers track rolling error rate and latency per provider; the router
+# uses them to try the healthiest provider first and skip dead ones
+breakers = {name: CircuitBreaker(name) for name in rate_limiters}
+provider_router = ProviderRouter(breakers)
+
+# Concurrent identical upstream requests share one in-flight fetch
+upstream_flights = SingleFlight()
+
+async def upstream_get(provider, url, params=None, headers=None, priority=None, tail=False):
+    """GET a provider URL and return its parsed JSON
+    
+    Identical in-flight requests are coalesced, and each real request spends one
+    token from the provider's bucket. Priority defaults to the caller's context.
+    Raises CircuitOpen without touching the network while the provider's circuit
+    is open. A `tail` request (a market page after the first, which fetch_pages
+    may drop) never counts as a provider failure.
+    """
+    key = (provider, url, tuple(sorted((params or {}).items())))
+    if priority is None:
+        priority = request_priority.get()
+    
+    async def fetch():
+        breaker = breakers[provider]
+        if not breaker.allow():
+            raise CircuitOpen(f"{provider} circuit is open")
+        try:
+            await rate_limiters[provider].acquire(priority, UPSTREAM_TIMEOUT)
+        except (RateLimitExceeded, asyncio.CancelledError):
+            breaker.release()
+            raise
+        
+        started = time.monotonic()
+        try:
+            response = await upstream.get(provider, url, params=params, headers=headers)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPStatusError as e:
+            # Only throttling and server errors say anything about provider health
+            status = e.response.status_code
+            if tail:
+                breaker.release()
+            elif status == 429 or status >= 500:
+                breaker.record_failure(time.monotonic() - started)
+            else:
+                breaker.record_success(time.monotonic() - started)
+            raise
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            if tail:
+                breaker.release()
+            else:
+                breaker.record_failure(time.monotonic() - started)
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return data
+    
+    return await upstream_flights.do(key, fetch)
+
+# Response cache: (ttl, stale_ttl) in seconds per endpoint. Stale entries are
+# served instantly while a background refresh runs, and any previous value is
+# served if every provider fails.
+response_cache = ResponseCache()
+# Markets are republished by the poller every PRICE_REFRESH_INTERVAL, so they stay
+# fresh until a refresh is overdue; a shorter TTL would make readers between its
+# expiry and the next publish reload the whole universe themselves.
+PRICE_REFRESH_INTERVAL = float(os.getenv("PRICE_REFRESH_INTERVAL", "30"))  # seconds between market refreshes
+MARKETS_TTL_MARGIN = 15  # seconds a refresh may take (paged loads wait on rate-limit tokens)
+MARKETS_CACHE_TTL = (PRICE_REFRESH_INTERVAL + MARKETS_TTL_MARGIN, 300)
+GLOBAL_CACHE_TTL = (60, 600)
+FEAR_GREED_CACHE_TTL = (300, 3600)
+
+# Coin details: one trimmed entry per coin, bounded by serialized size. The most
+# requested coins are reloaded in the background before they expire.
+COIN_DETAIL_CACHE_TTL = (120, 1800)
+COIN_DETAIL_CACHE_BYTES = int(os.getenv("COIN_DETAIL_CACHE_BYTES", str(8 * 1024 * 1024)))
+COIN_DETAIL_HOT_SIZE = 20
+COIN_DETAIL_REFRESH_INTERVAL = 30  # seconds between hot-coin sweeps
+coin_details = DetailCache(COIN_DETAIL_CACHE_BYTES, sizeof=lambda payload: len(payload.encode(JSON)))
+coin_refresh_task = None
+
+# Shared state across workers/replicas: in-process by default, a shared directory
+# when STATE_DIR is set (start.py does this for multi-worker runs), Redis when
+# REDIS_URL is set.
+# Only the worker holding the poller lease fetches markets; it publishes each refresh
+# on MARKETS_CHANNEL and every worker fans it out to its own sockets.
+state = create_state(os.getenv("REDIS_URL"), os.getenv("STATE_DIR"))
+MARKETS_CHANNEL = "markets"
+POLLER_LEASE = "poller"
+COIN_REFRESH_LEASE = "coin-refresh"
+
+# WebSocket connection manager; sockets subscribe to topics and only receive those
 manager = ConnectionManager()
 
+# Shared market refresh: one upstream fetch per interval, fanned out to all sockets
+PRICE_STREAM_SIZE = 20  # coins pushed on /ws/prices
+POLLER_LEASE_TTL = max(3 * PRICE_REFRESH_INTERVAL, 10)  # a dead leader is replaced within this many seconds
+
+# Channels a client can subscribe to. "prices" clients may narrow the stream to
+# a symbol watchlist and cap their update rate; every distinct (symbols, interval)
+# pair is one PriceStream topic, diffed and serialized once per refresh.
+CHANNELS = ("prices", "signals", "global", "fear_greed")
+MAX_WATCHED_SYMBOLS = 50
+MAX_PUSH_INTERVAL = 3600  # seconds
+DEFAULT_PRICE_TOPIC = "prices"
+
+# /ws/prices delta protocol: a price_update snapshot carries the current seq;
+# each later price_delta carries only changed fields and the seq it applies to
+price_streams = {}  # topic -> PriceStream
+channel_messages = {}  # "global" / "fear_greed" -> (value, serialized message) last published
+market_refresh_task = None
+
+# Streaming indicator state per coin, advanced on every market refresh
+indicator_book = IndicatorBook()
+
+# VIP signals are recomputed once per market refresh and served from this snapshot
+signal_snapshot = None
+
 @app.get("/api/health")
 async def health_check():
     return {
         "status": "healthy",
         "service": "Krypticks API",
-        "coingecko": "operational" if coingecko_working else "degraded",
-        "cryptocompare": "operational" if cryptocompare_working else "degraded",
-        "coinstats": "operational" if coinstats_working else "degraded"
+        "coingecko": "operational" if breakers["coingecko"].state == "closed" else "degraded",
+        "cryptocompare": "operational" if breakers["cryptocompare"].state == "closed" else "degraded",
+        "coinstats": "operational" if breakers["coinstats"].state == "closed" else "degraded",
+        "breakers": {name: breaker.stats() for name, breaker in breakers.items()},
+        "state": state.stats(),
+        "websocket": manager.stats(),
+        "price_streams": len(price_streams),
+        "registry": coin_registry.stats(),
+        "signals_version": signal_snapshot.version if signal_snapshot else None,
+        "cache": response_cache.stats(),
+        "coin_details": coin_details.stats(),
+        "ohlc_aggregates": ohlc_aggregate_cache.stats(),
+        "upstream_coalescing": upstream_flights.stats(),
+        "upstream_pools": upstream.stats(),
+        "rate_limits": {name: bucket.stats() for name, bucket in rate_limiters.items()},
+        "hedging": {
+            "enabled": HEDGE_MARKET_REQUESTS,
+            **hedge_metrics,
+            "hedge_rate": round(hedge_metrics["hedged"] / hedge_metrics["requests"], 3) if hedge_metrics["requests"] else 0,
+            "delays": {name: round(hedge_delay(name), 3) for name in MARKET_FETCHERS},
+        }
     }
 
+# Market universe: the top MARKET_UNIVERSE_SIZE coins, fetched as concurrent pages
+# and served from an indexed table; only the top SIGNAL_UNIVERSE_SIZE feed the
+# streaming indicators and VIP signals.
+MARKET_UNIVERSE_SIZE = int(os.getenv("MARKET_UNIVERSE_SIZE", "1000"))
+COINGECKO_PAGE_SIZE = 250
+CRYPTOCOMPARE_PAGE_SIZE = 100
+COINSTATS_PAGE_SIZE = 100
+MARKETS_DEFAULT_PAGE_SIZE = 50  # /api/markets without parameters: the top 50, as before
+MARKETS_MAX_PAGE_SIZE = 250
+MARKET_QUERY_CACHE_SIZE = 256
+SIGNAL_UNIVERSE_SIZE = int(os.getenv("SIGNAL_UNIVERSE_SIZE", "250"))  # one full CoinGecko page, sparklines included
+SEARCH_MAX_RESULTS = 50
+market_table = None
+market_query_payloads = {}  # query -> Payload, for the current market_table only
+coin_registry = CoinRegistry()  # ids, tickers and provider ids of every coin seen in the universe
+
+def page_count(page_size):
+    return -(-MARKET_UNIVERSE_SIZE // page_size)
+
 async def fetch_markets_coingecko():
-    """Fetch markets from CoinGecko API"""
-    global last_coingecko_call, coingecko_working
+    """Fetch the market universe from CoinGecko API, one concurrent request per page"""
+    url = "https://api.coingecko.com/api/v3/coins/markets"
+    headers = {}
+    if COINGECKO_API_KEY:
+        headers["x-cg-demo-api-key"] = COINGECKO_API_KEY
     
-    time_since_last_call = time.time() - last_coingecko_call
-    if time_since_last_call < COINGECKO_RATE_LIMIT:
-        await asyncio.sleep(COINGECKO_RATE_LIMIT - time_since_last_call)
-    
-    try:
-        url = "https://api.coingecko.com/api/v3/coins/markets"
+    async def fetch_page(page):
         params = {
             "vs_currency": "usd",
             "order": "market_cap_desc",
-            "per_page": 50,
-            "page": 1,
+            "per_page": COINGECKO_PAGE_SIZE,
+            "page": page,
             "sparkline": True,
             "price_change_percentage": "24h,7d"
         }
-        
-        headers = {}
-        if COINGECKO_API_KEY:
-            headers["x-cg-demo-api-key"] = COINGECKO_API_KEY
-        
-        response = await http_client.get(url, params=params, headers=headers, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        last_coingecko_call = time.time()
-        coingecko_working = True
-        return data
+        return await upstream_get("coingecko", url, params, headers, tail=page > 1)
+    
+    try:
+        data = await fetch_pages(fetch_page, page_count(COINGECKO_PAGE_SIZE))
+        return data[:MARKET_UNIVERSE_SIZE]
     except Exception as e:
-        coingecko_working = False
         print(f"CoinGecko fetch failed: {e}")
         return None
 
 async def fetch_markets_cryptocompare():
-    """Fetch markets from CryptoCompare API"""
-    global last_cryptocompare_call, cryptocompare_working
-    
-    time_since_last_call = time.time() - last_cryptocompare_call
-    if time_since_last_call < CRYPTOCOMPARE_RATE_LIMIT:
-        await asyncio.sleep(CRYPTOCOMPARE_RATE_LIMIT - time_since_last_call)
-    
+    """Fetch the market universe from CryptoCompare API, one concurrent request per page"""
     try:
-        url = "https://min-api.cryptocompare.com/data/top/mktcapfull"
-        params = {
-            "limit": 50,
-            "tsym": "USD",
-            "api_key": CRYPTOCOMPARE_API_KEY
-        }
-        
-        response = await http_client.get(url, params=params, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        last_cryptocompare_call = time.time()
-        
-        if data.get("Response") == "Success":
-            cryptocompare_working = True
-            transformed = []
-            for coin_data in data.get("Data", []):
-                coin_info = coin_data.get("CoinInfo", {})
-                display = coin_data.get("DISPLAY", {}).get("USD", {})
-                
-                transformed.append({
-                    "id": coin_info.get("Name", "").lower(),
-                    "symbol": coin_info.get("Name", ""),
-                    "name": coin_info.get("FullName", ""),
-                    "image": f"https://cryptocompare.com{coin_info.get('ImageUrl', '')}",
-                    "current_price": float(display.get("PRICE", "0").replace("$", "").replace(",", "")) if display.get("PRICE") else 0,
-                    "market_cap": float(display.get("MKTCAP", "0").replace("$", "").replace(",", "")) if display.get("MKTCAP") else 0,
-                    "market_cap_rank": coin_data.get("SortOrder"),
-                    "total_volume": float(display.get("VOLUME24HOUR", "0").replace("$", "").replace(",", "")) if display.get("VOLUME24HOUR") else 0,
-                    "price_change_percentage_24h": float(display.get("CHANGEPCT24HOUR", "0")) if display.get("CHANGEPCT24HOUR") else 0,
-                    "sparkline_in_7d": {"price": []}
-                })
-            return transformed[:50]
-        else:
-            cryptocompare_working = False
-            return None
+        data = await fetch_pages(fetch_cryptocompare_page, page_count(CRYPTOCOMPARE_PAGE_SIZE))
+        return data[:MARKET_UNIVERSE_SIZE] or None
     except Exception as e:
-        cryptocompare_working = False
         print(f"CryptoCompare fetch failed: {e}")
         return None
 
-async def fetch_markets_coinstats():
-    """Fetch markets from Coinstats API"""
-    global last_coinstats_call, coinstats_working
+async def fetch_cryptocompare_page(page):
+    """One page of CryptoCompare markets (pages count from 1 here, from 0 upstream)"""
+    url = "https://min-api.cryptocompare.com/data/top/mktcapfull"
+    params = {
+        "limit": CRYPTOCOMPARE_PAGE_SIZE,
+        "page": page - 1,
+        "tsym": "USD",
+        "api_key": CRYPTOCOMPARE_API_KEY
+    }
     
-    time_since_last_call = time.time() - last_coinstats_call
-    if time_since_last_call < COINSTATS_RATE_LIMIT:
-        await asyncio.sleep(COINSTATS_RATE_LIMIT - time_since_last_call)
+    data = await upstream_get("cryptocompare", url, params, tail=page > 1)
     
+    if data.get("Response") != "Success":
+        return None
+    return normalize_markets(data.get("Data") or [], map_cryptocompare_market, (page - 1) * CRYPTOCOMPARE_PAGE_SIZE + 1)
+
+async def fetch_markets_coinstats():
+    """Fetch the market universe from Coinstats API, one concurrent request per page"""
     try:
-        url = "https://openapi.coinstats.app/public/v1/coins"
-        params = {
-            "limit": 50,
-            "currency": "USD"
-        }
-        headers = {}
-        if COINSTATS_API_KEY:
-            headers["X-API-Key"] = COINSTATS_API_KEY
-        
-        response = await http_client.get(url, params=params, headers=headers, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        last_coinstats_call = time.time()
-        
-        if data.get("result"):
-            coinstats_working = True
-            transformed = []
-            for idx, coin_data in enumerate(data.get("result", [])[:50]):
-                transformed.append({
-                    "id": coin_data.get("id", "").lower(),
-                    "symbol": coin_data.get("symbol", "").upper(),
-                    "name": coin_data.get("name", ""),
-                    "image": coin_data.get("icon", ""),
-                    "current_price": float(coin_data.get("price", 0)),
-                    "market_cap": float(coin_data.get("marketCap", 0)),
-                    "market_cap_rank": idx + 1,
-                    "total_volume": float(coin_data.get("volume", 0)),
-                    "price_change_percentage_24h": float(coin_data.get("priceChange", 0)),
-                    "sparkline_in_7d": {"price": []}
-                })
-            return transformed
-        else:
-            coinstats_working = False
-            return None
+        data = await fetch_pages(fetch_coinstats_page, page_count(COINSTATS_PAGE_SIZE))
+        return data[:MARKET_UNIVERSE_SIZE] or None
     except Exception as e:
-        coinstats_working = False
         print(f"Coinstats fetch failed: {e}")
         return None
 
-@app.get("/api/markets")
-async def get_markets():
-    """Get top cryptocurrency market data with triple-API failover"""
-    global cached_markets
+async def fetch_coinstats_page(page):
+    """One page of Coinstats markets"""
+    url = "https://openapi.coinstats.app/public/v1/coins"
+    skip = (page - 1) * COINSTATS_PAGE_SIZE
+    params = {
+        "skip": skip,
+        "limit": COINSTATS_PAGE_SIZE,
+        "currency": "USD"
+    }
+    headers = {}
+    if COINSTATS_API_KEY:
+        headers["X-API-Key"] = COINSTATS_API_KEY
     
-    # Try CoinGecko first (primary)
-    print("Attempting CoinGecko API...")
-    data = await fetch_markets_coingecko()
+    data = await upstream_get("coinstats", url, params, headers, tail=page > 1)
     
-    if data is None:
-        # Fallback to CryptoCompare
-        print("CoinGecko failed, attempting CryptoCompare...")
-        data = await fetch_markets_cryptocompare()
+    if not data.get("result"):
+        return None
+    return normalize_markets(data["result"][:COINSTATS_PAGE_SIZE], map_coinstats_market, skip + 1)
+
+# Market providers in order of preference; CoinGecko is the only one with sparklines
+MARKET_FETCHERS = {
+    "coingecko": fetch_markets_coingecko,
+    "cryptocompare": fetch_markets_cryptocompare,
+    "coinstats": fetch_markets_coinstats,
+}
+
+# Hedged market requests (opt-in): if the primary provider hasn't delivered the whole
+# universe within its own p{HEDGE_PERCENTILE} full-load time (every page, including
+# rate-limiter waits), the next provider is asked too and the first usable answer wins
+HEDGE_MARKET_REQUESTS = os.getenv("HEDGE_MARKET_REQUESTS", "").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = 0.25  # seconds
+HEDGE_MARGIN = 1.1  # so ordinary jitter around the percentile doesn't hedge
+HEDGE_DEFAULT_DELAY = 2.0  # seconds, used until the primary has latency history
+hedge_metrics = {"requests": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0}
+market_load_latency = {name: LatencyWindow() for name in MARKET_FETCHERS}  # successful full loads
+
+async def fetch_markets(provider):
+    """One provider's full, multi-page market fetch, timed for the hedge delay when it succeeds"""
+    started = time.monotonic()
+    data = await MARKET_FETCHERS[provider]()
+    if data:
+        market_load_latency[provider].record(time.monotonic() - started)
+    return data
+
+def hedge_delay(provider):
+    """How long to wait on a provider before hedging, from its recent full-load percentile"""
+    latency = market_load_latency[provider].percentile(HEDGE_PERCENTILE)
+    if latency is None:
+        return HEDGE_DEFAULT_DELAY
+    return max(latency * HEDGE_MARGIN, HEDGE_MIN_DELAY)
+
+async def load_markets_hedged(providers):
+    """Race providers in health order, launching the next one when the current hedge delay passes"""
+    remaining = list(providers)
+    primary = remaining[0]
+    names = {}
+    pending = set()
+    hedge_metrics["requests"] += 1
     
-    if data is None:
-        # Fallback to Coinstats
-        print("CryptoCompare failed, attempting Coinstats...")
-        data = await fetch_markets_coinstats()
+    def launch():
+        provider = remaining.pop(0)
+        print(f"Attempting {provider} API...")
+        task = asyncio.create_task(fetch_markets(provider))
+        names[task] = provider
+        pending.add(task)
     
-    if data:
-        cached_markets = data
-        return data
-    elif cached_markets:
-        # All APIs failed, use cache
-        print("All APIs failed, returning cached data")
-        return cached_markets
-    else:
+    launch()
+    try:
+        while pending:
+            timeout = hedge_delay(primary) if remaining else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                data = task.result()
+                if data:
+                    if names[task] == primary:
+                        hedge_metrics["primary_wins"] += 1
+                    else:
+                        hedge_metrics["hedge_wins"] += 1
+                    return data
+                print(f"{names[task]} failed")
+            if remaining and not done:
+                # Nothing answered in time: hedge with the next provider
+                hedge_metrics["hedged"] += 1
+                launch()
+            elif remaining and not pending:
+                # Everything in flight failed: plain failover
+                launch()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def load_markets():
+    """Fetch top cryptocurrency market data from the healthiest available provider"""
+    providers = provider_router.order(MARKET_FETCHERS)
+    if HEDGE_MARKET_REQUESTS and len(providers) > 1:
+        data = await load_markets_hedged(providers)
+        if data:
+            return data
         raise Exception("Unable to fetch market data from any source")
+    
+    for provider in providers:
+        print(f"Attempting {provider} API...")
+        data = await fetch_markets(provider)
+        if data:
+            return data
+        print(f"{provider} failed, trying next provider...")
+    
+    raise Exception("Unable to fetch market data from any source")
 
-@app.get("/api/global")
-async def get_global_metrics():
-    """Get global cryptocurrency metrics with triple-API fallback"""
-    global cached_global
+async def load_markets_shared():
+    return await state.read_through("markets", load_markets, MARKETS_CACHE_TTL[0])
+
+async def load_market_snapshot():
+    return MarketSnapshot(await load_markets_shared())
+
+async def get_markets():
+    """Top cryptocurrency market data as a MarketSnapshot, served from cache"""
+    ttl, stale_ttl = MARKETS_CACHE_TTL
+    return await response_cache.get("markets", load_market_snapshot, ttl, stale_ttl)
+
+def get_market_table(markets):
+    """Indexed table for a market snapshot, rebuilt only when the cached snapshot changes"""
+    global market_table
+    if market_table is None or market_table.source is not markets:
+        market_table = MarketTable(markets)
+        market_query_payloads.clear()
+        coin_registry.ingest(markets.records(RECORD_FIELDS))
+    return market_table
+
+def split_param(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+@app.get("/api/markets")
+async def get_markets_endpoint(request: Request, page: int = 1, per_page: int = MARKETS_DEFAULT_PAGE_SIZE,
+                               sort: str = None, order: str = None, ids: str = None, symbols: str = None,
+                               min_market_cap: float = None, min_volume: float = None):
+    """Get cryptocurrency market data from the cached universe, paged, sorted and filtered
+    
+    The body is always a plain list of coins (the top 50 by market cap without
+    parameters); X-Total-Count carries the number of matching coins.
+    """
+    if sort is not None and sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_FIELDS)}")
+    if order not in (None, "asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    page = max(1, page)
+    per_page = max(1, min(per_page, MARKETS_MAX_PAGE_SIZE))
+    
+    table = get_market_table(await get_markets())
+    query = (page, per_page, sort, order, ids, symbols, min_market_cap, min_volume)
+    cached = market_query_payloads.get(query)
+    if cached is None:
+        coins, total = table.query(
+            page, per_page, sort, None if order is None else order == "desc",
+            split_param(ids), split_param(symbols), min_market_cap, min_volume
+        )
+        if len(market_query_payloads) >= MARKET_QUERY_CACHE_SIZE:
+            market_query_payloads.clear()
+        cached = (Payload(coins), total)
+        market_query_payloads[query] = cached
+    payload, total = cached
+    return payload.response(
+        request.headers.get("accept", ""),
+        headers={"X-Total-Count": str(total)},
+        if_none_match=request.headers.get("if-none-match", "")
+    )
+
+@app.get("/api/search")
+async def search_coins(q: str = "", limit: int = 10):
+    """Coins matching a ticker, id or name: exact matches first, then prefixes, then close spellings"""
+    limit = max(1, min(limit, SEARCH_MAX_RESULTS))
+    table = get_market_table(await get_markets())
+    results = []
+    for record in coin_registry.search(q, limit):
+        coin = table.get(record.id, ("current_price",))
+        results.append({**record.to_dict(), "current_price": coin.get("current_price") if coin else None})
+    return {"query": q, "results": results}
+
+async def load_global_metrics():
+    """Fetch global cryptocurrency metrics with triple-API fallback"""
+    # Try CoinGecko first
+    url = "https://api.coingecko.com/api/v3/global"
+    headers = {}
+    if COINGECKO_API_KEY:
+        headers["x-cg-demo-api-key"] = COINGECKO_API_KEY
     
     try:
-        # Try CoinGecko first
-        url = "https://api.coingecko.com/api/v3/global"
-        headers = {}
-        if COINGECKO_API_KEY:
-            headers["x-cg-demo-api-key"] = COINGECKO_API_KEY
+        data = await upstream_get("coingecko", url, None, headers)
         
-        try:
-            response = await http_client.get(url, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            result = {
-                "total_market_cap": data["data"]["total_market_cap"]["usd"],
-                "total_volume": data["data"]["total_volume"]["usd"],
-                "btc_dominance": data["data"]["market_cap_percentage"]["btc"],
-                "eth_dominance": data["data"]["market_cap_percentage"].get("eth", 0),
-                "market_cap_change_24h": data["data"]["market_cap_change_percentage_24h_usd"],
-                "active_cryptocurrencies": data["data"]["active_cryptocurrencies"]
-            }
-            cached_global = result
-            return result
-        except Exception as e:
-            print(f"CoinGecko global metrics failed: {e}")
-            
-            # Fallback to CryptoCompare
-            if cryptocompare_working or CRYPTOCOMPARE_API_KEY:
-                try:
-                    url = "https://min-api.cryptocompare.com/data/v1/global/mktcap"
-                    params = {"api_key": CRYPTOCOMPARE_API_KEY}
-                    response = await http_client.get(url, params=params, timeout=10.0)
-                    response.raise_for_status()
-                    
-                    result = {
-                        "total_market_cap": 2840000000000,
-                        "total_volume": 98000000000,
-                        "btc_dominance": 45,
-                        "eth_dominance": 15,
-                        "market_cap_change_24h": 2.5,
-                        "active_cryptocurrencies": 5000
-                    }
-                    cached_global = result
-                    return result
-                except Exception as cc_error:
-                    print(f"CryptoCompare global metrics failed: {cc_error}")
-            
-            # Fallback to Coinstats
-            if coinstats_working or COINSTATS_API_KEY:
-                try:
-                    result = {
-                        "total_market_cap": 2840000000000,
-                        "total_volume": 98000000000,
-                        "btc_dominance": 45,
-                        "eth_dominance": 15,
-                        "market_cap_change_24h": 2.5,
-                        "active_cryptocurrencies": 5000
-                    }
-                    cached_global = result
-                    return result
-                except Exception as cs_error:
-                    print(f"Coinstats global metrics failed: {cs_error}")
-            
-            if cached_global:
-                return cached_global
-            raise
+        return {
+            "total_market_cap": data["data"]["total_market_cap"]["usd"],
+            "total_volume": data["data"]["total_volume"]["usd"],
+            "btc_dominance": data["data"]["market_cap_percentage"]["btc"],
+            "eth_dominance": data["data"]["market_cap_percentage"].get("eth", 0),
+            "market_cap_change_24h": data["data"]["market_cap_change_percentage_24h_usd"],
+            "active_cryptocurrencies": data["data"]["active_cryptocurrencies"]
+        }
     except Exception as e:
-        print(f"Error fetching global metrics: {e}")
-        if cached_global:
-            print("Using cached global metrics")
-            return cached_global
+        print(f"CoinGecko global metrics failed: {e}")
+        
+        # Fallback to CryptoCompare
+        if breakers["cryptocompare"].available():
+            try:
+                url = "https://min-api.cryptocompare.com/data/v1/global/mktcap"
+                params = {"api_key": CRYPTOCOMPARE_API_KEY}
+                await upstream_get("cryptocompare", url, params)
+                
+                return {
+                    "total_market_cap": 2840000000000,
+                    "total_volume": 98000000000,
+                    "btc_dominance": 45,
+                    "eth_dominance": 15,
+                    "market_cap_change_24h": 2.5,
+                    "active_cryptocurrencies": 5000
+                }
+            except Exception as cc_error:
+                print(f"CryptoCompare global metrics failed: {cc_error}")
+        
+        # Fallback to Coinstats
+        if breakers["coinstats"].available():
+            return {
+                "total_market_cap": 2840000000000,
+                "total_volume": 98000000000,
+                "btc_dominance": 45,
+                "eth_dominance": 15,
+                "market_cap_change_24h": 2.5,
+                "active_cryptocurrencies": 5000
+            }
         raise
 
+async def load_global_shared():
+    return await state.read_through("global", load_global_metrics, GLOBAL_CACHE_TTL[0])
+
+@app.get("/api/global")
+async def get_global_metrics():
+    """Get global cryptocurrency metrics, served from cache"""
+    ttl, stale_ttl = GLOBAL_CACHE_TTL
+    return await response_cache.get("global", load_global_shared, ttl, stale_ttl)
+
+async def load_fear_greed_index():
+    """Fetch the Fear & Greed Index"""
+    url = "https://api.alternative.me/fng/"
+    data = await upstream_get("alternative", url)
+    return {
+        "value": int(data["data"][0]["value"]),
+        "classification": data["data"][0]["value_classification"]
+    }
+
+async def load_fear_greed_shared():
+    return await state.read_through("fear_greed", load_fear_greed_index, FEAR_GREED_CACHE_TTL[0])
+
 @app.get("/api/fear-greed")
 async def get_fear_greed_index():
-    """Get Fear & Greed Index"""
-    global cached_fear_greed
-    
+    """Get Fear & Greed Index, served from cache"""
+    ttl, stale_ttl = FEAR_GREED_CACHE_TTL
     try:
-        url = "https://api.alternative.me/fng/"
-        response = await http_client.get(url, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        result = {
-            "value": int(data["data"][0]["value"]),
-            "classification": data["data"][0]["value_classification"]
-        }
-        cached_fear_greed = result
-        return result
+        return await response_cache.get("fear_greed", load_fear_greed_shared, ttl, stale_ttl)
     except Exception as e:
         print(f"Error fetching fear & greed: {e}")
-        if cached_fear_greed:
-            print("Using cached fear & greed data")
-            return cached_fear_greed
         return {"value": 50, "classification": "Neutral"}
 
-@app.get("/api/coin/{coin_id}")
-async def get_coin_details(coin_id: str):
-    """Get detailed information about a specific coin"""
+# Fields kept from a CoinGecko coins/{id} response; currency maps keep only USD
+COIN_DETAIL_FIELDS = (
+    "id", "symbol", "name", "image", "categories", "hashing_algorithm", "genesis_date",
+    "market_cap_rank", "last_updated",
+)
+COIN_MARKET_USD_FIELDS = (
+    "current_price", "market_cap", "fully_diluted_valuation", "total_volume", "high_24h", "low_24h",
+    "ath", "ath_change_percentage", "ath_date", "atl", "atl_change_percentage", "atl_date",
+)
+COIN_MARKET_FIELDS = (
+    "price_change_percentage_24h", "price_change_percentage_7d", "price_change_percentage_30d",
+    "price_change_percentage_1y", "market_cap_change_percentage_24h",
+    "circulating_supply", "total_supply", "max_supply",
+)
+
+def trim_coin_details(data):
+    """Reduce a CoinGecko coin payload (tens of KB, prices in ~60 currencies) to what a detail view shows"""
+    trimmed = {field: data.get(field) for field in COIN_DETAIL_FIELDS}
+    description = (data.get("description") or {}).get("en")
+    trimmed["description"] = {"en": description or ""}
+    links = data.get("links") or {}
+    trimmed["links"] = {
+        "homepage": [url for url in links.get("homepage") or () if url],
+        "blockchain_site": [url for url in links.get("blockchain_site") or () if url][:3],
+        "subreddit_url": links.get("subreddit_url"),
+        "twitter_screen_name": links.get("twitter_screen_name"),
+        "repos_url": {"github": (links.get("repos_url") or {}).get("github") or []},
+    }
+    market_data = data.get("market_data") or {}
+    trimmed["market_data"] = {
+        **{field: {"usd": (market_data.get(field) or {}).get("usd")} for field in COIN_MARKET_USD_FIELDS},
+        **{field: market_data.get(field) for field in COIN_MARKET_FIELDS},
+    }
+    return trimmed
+
+async def load_coin_details(coin_id: str):
+    """Fetch details for one coin with triple-API fallback
+    
+    `coin_id` may be a CoinGecko id or a ticker; the registry maps it to the id
+    each provider expects so every fallback asks for the right coin.
+    """
     try:
         # Try CoinGecko first
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
+        url = f"https://api.coingecko.com/api/v3/coins/{coin_registry.provider_id(coin_id, 'coingecko')}"
         params = {
             "localization": False,
             "tickers": False,
@@ -375,38 +653,33 @@ async def get_coin_details(coin_id: str):
             headers["x-cg-demo-api-key"] = COINGECKO_API_KEY
         
         try:
-            response = await http_client.get(url, params=params, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+            return trim_coin_details(await upstream_get("coingecko", url, params, headers, priority=PRIORITY_ADHOC))
         except Exception as e:
             print(f"CoinGecko coin details failed: {e}")
             
             # Fallback to CryptoCompare
-            if cryptocompare_working or CRYPTOCOMPARE_API_KEY:
+            if breakers["cryptocompare"].available():
                 try:
                     url = "https://min-api.cryptocompare.com/data/pricemulti"
                     params = {
-                        "fsyms": coin_id.upper(),
+                        "fsyms": coin_registry.provider_id(coin_id, "cryptocompare"),
                         "tsyms": "USD",
                         "api_key": CRYPTOCOMPARE_API_KEY
                     }
-                    response = await http_client.get(url, params=params, timeout=10.0)
-                    response.raise_for_status()
-                    data = response.json()
-                    return {"id": coin_id, "market_data": data}
+                    data = await upstream_get("cryptocompare", url, params, priority=PRIORITY_ADHOC)
+                    return trim_coin_details(cryptocompare_coin_details(data, coin_id, params["fsyms"]))
                 except Exception as cc_error:
                     print(f"CryptoCompare coin details failed: {cc_error}")
             
             # Fallback to Coinstats
-            if coinstats_working or COINSTATS_API_KEY:
+            if breakers["coinstats"].available():
                 try:
-                    url = f"https://openapi.coinstats.app/public/v1/coins/{coin_id}"
+                    url = f"https://openapi.coinstats.app/public/v1/coins/{coin_registry.provider_id(coin_id, 'coinstats')}"
                     headers = {}
                     if COINSTATS_API_KEY:
                         headers["X-API-Key"] = COINSTATS_API_KEY
-                    response = await http_client.get(url, headers=headers, timeout=10.0)
-                    response.raise_for_status()
-                    return response.json()
+                    data = await upstream_get("coinstats", url, None, headers, priority=PRIORITY_ADHOC)
+                    return trim_coin_details(coinstats_coin_details(data, coin_id))
                 except Exception as cs_error:
                     print(f"Coinstats coin details failed: {cs_error}")
             raise
@@ -414,49 +687,206 @@ async def get_coin_details(coin_id: str):
         print(f"Error fetching coin details: {e}")
         raise
 
+def coin_detail_loader(coin_id: str):
+    async def load():
+        if not state.shared:
+            # Single worker: coin_details is the only copy, bounded by its byte budget
+            return Payload(await load_coin_details(coin_id))
+        details = await state.read_through(f"coin:{coin_id}", lambda: load_coin_details(coin_id), COIN_DETAIL_CACHE_TTL[0])
+        return Payload(details)
+    return load
+
+@app.get("/api/coin/{coin_id}")
+async def get_coin_details(request: Request, coin_id: str):
+    """Get detailed information about a specific coin, served from the coin detail cache"""
+    # Tickers and ids of the same coin share one entry
+    key = coin_registry.provider_id(coin_id, "coingecko").lower()
+    ttl, stale_ttl = COIN_DETAIL_CACHE_TTL
+    try:
+        payload = await coin_details.get(key, coin_detail_loader(key), ttl, stale_ttl)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Unknown coin {coin_id}")
+        raise
+    return payload.response(
+        request.headers.get("accept", ""),
+        if_none_match=request.headers.get("if-none-match", "")
+    )
+
+async def refresh_coin_details(coin_id: str):
+    details = await load_coin_details(coin_id)
+    if state.shared:
+        await state.set(f"coin:{coin_id}", dumps_bytes(details), COIN_DETAIL_CACHE_TTL[0])
+    return Payload(details)
+
+async def coin_refresh_loop():
+    """On one worker, reload the most requested coins before they expire and share them
+    
+    Other workers pick the new details up from shared state when their own
+    copies expire, so hot coins are fetched upstream once per TTL in total.
+    """
+    ttl = COIN_DETAIL_CACHE_TTL[0]
+    while True:
+        await asyncio.sleep(COIN_DETAIL_REFRESH_INTERVAL)
+        try:
+            if await state.lead(COIN_REFRESH_LEASE, 3 * COIN_DETAIL_REFRESH_INTERVAL):
+                for coin_id in coin_details.hot(COIN_DETAIL_HOT_SIZE):
+                    age = coin_details.age(coin_id)
+                    if age is not None and age < ttl - COIN_DETAIL_REFRESH_INTERVAL:
+                        continue
+                    try:
+                        await coin_details.refresh(coin_id, lambda coin_id=coin_id: refresh_coin_details(coin_id))
+                    except Exception:
+                        pass  # logged by the cache; the stale entry keeps being served
+        except Exception as e:
+            print(f"Coin detail refresh error: {e}")
+        coin_details.decay()
+
+def start_coin_refresh():
+    global coin_refresh_task
+    coin_refresh_task = asyncio.create_task(coin_refresh_loop())
+
+async def stop_coin_refresh():
+    if coin_refresh_task:
+        coin_refresh_task.cancel()
+        try:
+            await coin_refresh_task
+        except asyncio.CancelledError:
+            pass
+
+# Local OHLC history: hourly candles persisted in SQLite so each request only
+# fetches the hours the store doesn't have yet
+OHLC_DB_PATH = os.getenv("OHLC_DB_PATH", "data/ohlc.sqlite3")
+OHLC_SYNC_INTERVAL = 60  # seconds before the still-forming hour is re-fetched
+OHLC_MAX_FETCH = 2000  # CryptoCompare histohour maximum per request
+OHLC_MAX_BACKFILL_PAGES = 10  # histohour pages fetched per sync when extending history backwards
+OHLC_MAX_HISTORY_HOURS = 2 * 365 * 24  # furthest back any request will backfill
+OHLC_MAX_RANGE_CANDLES = OHLC_MAX_FETCH  # most candles one /api/ohlc range returns (the latest of the range)
+HOUR = 3600
+candle_store = None  # opened in lifespan
+ohlc_synced_at = {}
+ohlc_history_floor = {}  # symbol -> oldest hour the provider has, once a backfill came back empty
+ohlc_aggregate_cache = AggregateCache(ttl=OHLC_SYNC_INTERVAL)
+
+async def fetch_histohour(symbol, limit, to_ts=None):
+    """Fetch up to limit + 1 hourly candles ending at to_ts (default now) from CryptoCompare"""
+    url = "https://min-api.cryptocompare.com/data/v2/histohour"
+    params = {
+        "fsym": symbol,
+        "tsym": "USD",
+        "limit": limit,
+        "api_key": CRYPTOCOMPARE_API_KEY
+    }
+    if to_ts is not None:
+        params["toTs"] = to_ts
+    data = await upstream_get("cryptocompare", url, params, priority=PRIORITY_ADHOC)
+    if data.get("Response") != "Success":
+        raise Exception(data.get("Message") or "CryptoCompare histohour error")
+    return data["Data"]["Data"]
+
+async def sync_ohlc(symbol, start):
+    """Make sure hourly candles from `start` to the current hour are in the local store"""
+    now_hour = int(time.time()) // HOUR * HOUR
+    earliest, latest = await candle_store.bounds(symbol)
+    
+    if latest is None:
+        candles = await fetch_histohour(symbol, min(max((now_hour - start) // HOUR, 1), OHLC_MAX_FETCH))
+        await candle_store.insert(symbol, candles)
+        ohlc_synced_at[symbol] = time.monotonic()
+        if not candles:
+            return
+        earliest, latest = candles[0]["time"], candles[-1]["time"]
+    
+    # Backfill history older than anything stored, one page per request
+    start = max(start, now_hour - OHLC_MAX_HISTORY_HOURS * HOUR, ohlc_history_floor.get(symbol, 0))
+    for _ in range(OHLC_MAX_BACKFILL_PAGES):
+        if start >= earliest:
+            break
+        count = min((earliest - start) // HOUR, OHLC_MAX_FETCH)
+        candles = await fetch_histohour(symbol, count, to_ts=earliest - HOUR)
+        if not candles or candles[0]["time"] >= earliest:
+            # Nothing older exists upstream; don't ask again for this symbol
+            ohlc_history_floor[symbol] = earliest
+            break
+        await candle_store.insert(symbol, candles)
+        earliest = candles[0]["time"]
+    
+    # Fetch only the tail; the latest stored hour is included since it may still have been forming
+    if time.monotonic() - ohlc_synced_at.get(symbol, 0) >= OHLC_SYNC_INTERVAL:
+        missing = (now_hour - latest) // HOUR
+        candles = await fetch_histohour(symbol, min(max(missing, 1), OHLC_MAX_FETCH))
+        await candle_store.insert(symbol, candles)
+        ohlc_synced_at[symbol] = time.monotonic()
+
 @app.get("/api/ohlc/{symbol}")
-async def get_ohlc_data(symbol: str, limit: int = 100):
-    """Get OHLCV data - CryptoCompare primary, then CoinGecko, then Coinstats"""
+async def get_ohlc_data(request: Request, symbol: str, limit: int = 100, start: int = None, end: int = None):
+    """Get hourly OHLCV candles as JSON, or MessagePack when the client accepts it"""
+    data = await load_ohlc_data(symbol, limit, start, end)
+    return Payload(data).response(request.headers.get("accept", ""), if_none_match=request.headers.get("if-none-match", ""))
+
+async def load_ohlc_data(symbol: str, limit: int = 100, start: int = None, end: int = None):
+    """Hourly OHLCV data from the local store, synced from CryptoCompare; CoinGecko and Coinstats as fallbacks
+    
+    Without `start` the latest limit + 1 candles are returned (CryptoCompare's
+    convention); with `start`/`end` (unix seconds) the range is returned, starting
+    no earlier than OHLC_MAX_HISTORY_HOURS ago and capped to its latest
+    OHLC_MAX_RANGE_CANDLES candles.
+    The fallbacks only have 7 days of price points, which are turned into the
+    same candles (without volume) so every source returns the same shape.
+    """
     try:
-        # Primary: CryptoCompare
-        if cryptocompare_working or CRYPTOCOMPARE_API_KEY:
+        fsym = symbol.upper()
+        limit = max(1, min(limit, OHLC_MAX_FETCH))
+        now_hour = int(time.time()) // HOUR * HOUR
+        if start is not None:
+            start = max(start, now_hour - OHLC_MAX_HISTORY_HOURS * HOUR)
+        
+        # Primary: local store, topped up from CryptoCompare
+        if breakers["cryptocompare"].available():
             try:
-                url = f"https://min-api.cryptocompare.com/data/v2/histohour"
-                params = {
-                    "fsym": symbol.upper(),
-                    "tsym": "USD",
-                    "limit": limit,
-                    "api_key": CRYPTOCOMPARE_API_KEY
-                }
-                
-                response = await http_client.get(url, params=params, timeout=10.0)
-                response.raise_for_status()
-                return response.json()
+                if start is not None:
+                    # Only the latest OHLC_MAX_RANGE_CANDLES of the range are returned, so only those are synced
+                    since = max(start, min(end or now_hour, now_hour) - OHLC_MAX_RANGE_CANDLES * HOUR)
+                else:
+                    since = now_hour - limit * HOUR
+                await sync_ohlc(fsym, since)
             except Exception as e:
-                print(f"CryptoCompare OHLC failed: {e}")
+                print(f"CryptoCompare OHLC sync failed: {e}")
+        
+        candles = await candle_store.range(fsym, start, end, OHLC_MAX_RANGE_CANDLES if start is not None else limit + 1)
+        if candles:
+            return ohlc_response(candles)
         
         # Fallback: CoinGecko
         try:
-            url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}/market_chart"
+            url = f"https://api.coingecko.com/api/v3/coins/{coin_registry.provider_id(symbol, 'coingecko')}/market_chart"
             params = {
                 "vs_currency": "usd",
                 "days": 7
             }
-            response = await http_client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+            data = await upstream_get("coingecko", url, params, priority=PRIORITY_ADHOC)
+            candles = select_candles(points_to_candles(data.get("prices") or [], millis=True), limit, start, end)
+            if not candles:
+                raise Exception("no price points")
+            return ohlc_response(candles)
         except Exception as cg_error:
             print(f"CoinGecko OHLC failed: {cg_error}")
         
         # Final fallback: Coinstats
         try:
-            url = f"https://openapi.coinstats.app/public/v1/coins/{symbol.lower()}"
+            url = "https://openapi.coinstats.app/public/v1/charts"
+            params = {
+                "period": "1w",
+                "coinId": coin_registry.provider_id(symbol, "coinstats")
+            }
             headers = {}
             if COINSTATS_API_KEY:
                 headers["X-API-Key"] = COINSTATS_API_KEY
-            response = await http_client.get(url, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+            data = await upstream_get("coinstats", url, params, headers, priority=PRIORITY_ADHOC)
+            candles = select_candles(points_to_candles(data.get("chart") or []), limit, start, end)
+            if not candles:
+                raise Exception("no price points")
+            return ohlc_response(candles)
         except Exception as cs_error:
             print(f"Coinstats OHLC also failed: {cs_error}")
             raise
@@ -464,95 +894,272 @@ async def get_ohlc_data(symbol: str, limit: int = 100):
         print(f"Error fetching OHLC data: {e}")
         raise
 
-@app.websocket("/ws/prices")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time price updates"""
-    await manager.connect(websocket)
+@app.get("/api/ohlc/{symbol}/aggregate")
+async def get_ohlc_aggregate(request: Request, symbol: str, timeframe: str = "1d", limit: int = 100, points: int = None):
+    """Get the latest `limit` OHLCV bars resampled to 4h/1d/1w, optionally LTTB-downsampled to `points`"""
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(status_code=400, detail=f"timeframe must be one of {', '.join(TIMEFRAMES)}")
+    fsym = symbol.upper()
+    limit = max(1, limit)
+    key = (fsym, timeframe, limit, points)
+    accept = request.headers.get("accept", "")
+    if_none_match = request.headers.get("if-none-match", "")
+    cached = ohlc_aggregate_cache.get(key)
+    if cached is not None:
+        return cached.response(accept, if_none_match=if_none_match)
+    
+    size, offset = TIMEFRAMES[timeframe]
+    hours = min(limit * size // HOUR, OHLC_MAX_HISTORY_HOURS)
+    now_hour = int(time.time()) // HOUR * HOUR
+    start = now_hour - hours * HOUR
+    if breakers["cryptocompare"].available():
+        try:
+            await sync_ohlc(fsym, start)
+        except Exception as e:
+            print(f"CryptoCompare OHLC sync failed: {e}")
+    
+    # Start at a bar boundary so the first bar isn't partial
+    start = (start - offset) // size * size + offset
+    candles = await candle_store.range(fsym, start)
+    if not candles:
+        raise HTTPException(status_code=404, detail=f"No OHLC data for {fsym}")
+    bars = resample(candles, timeframe)[-limit:]
+    if points:
+        bars = lttb(bars, points)
+    
+    result = {
+        "Response": "Success",
+        "timeframe": timeframe,
+        "points": len(bars),
+        "Data": {
+            "TimeFrom": bars[0]["time"],
+            "TimeTo": bars[-1]["time"],
+            "Data": bars
+        }
+    }
+    payload = Payload(result)
+    ohlc_aggregate_cache.set(key, payload)
+    return payload.response(accept, if_none_match=if_none_match)
+
+async def market_refresh_loop():
+    """On the leader, fetch markets once per interval and publish them to every worker"""
+    # Market refreshes feeding live sockets jump ahead of ad-hoc lookups
+    request_priority.set(PRIORITY_REALTIME)
+    while True:
+        try:
+            if await state.lead(POLLER_LEASE, POLLER_LEASE_TTL):
+                # Force a refresh so the cache stays warm for HTTP readers too
+                markets = await response_cache.refresh("markets", refresh_market_snapshot)
+                if markets:
+                    body = dumps_bytes(markets.to_list())
+                    await state.set("markets", body, MARKETS_CACHE_TTL[0])
+                    await state.publish(MARKETS_CHANNEL, body)
+        except Exception as e:
+            print(f"Market refresh error: {e}")
+        await publish_channel("global", load_global_shared, GLOBAL_CACHE_TTL)
+        await publish_channel("fear_greed", load_fear_greed_shared, FEAR_GREED_CACHE_TTL)
+        await asyncio.sleep(PRICE_REFRESH_INTERVAL)
+
+async def refresh_market_snapshot():
+    return MarketSnapshot(await load_markets())
+
+async def on_markets_update(message):
+    """Fan a published market refresh out to this worker's indicators, caches and sockets"""
+    markets = loads(message)
+    if not markets or not isinstance(markets, list):
+        return
+    markets = MarketSnapshot(markets)
+    response_cache.set("markets", markets)
+    get_market_table(markets)
+    indicator_book.update(markets[:SIGNAL_UNIVERSE_SIZE])
+    snapshot = publish_signal_snapshot(markets[:SIGNAL_UNIVERSE_SIZE])
+    if snapshot:
+        manager.publish("signals", snapshot.message)
+    publish_prices(markets)
+
+def price_topic(symbols=None, interval=0):
+    if not symbols and not interval:
+        return DEFAULT_PRICE_TOPIC
+    return f"prices:{interval}:{','.join(sorted(symbols or ()))}"
+
+def get_price_stream(symbols=None, interval=0):
+    """Shared stream for a watchlist and rate, seeded from cached markets when new"""
+    topic = price_topic(symbols, interval)
+    stream = price_streams.get(topic)
+    if stream is None:
+        stream = PriceStream(topic, Payload, symbols, interval, PRICE_STREAM_SIZE)
+        price_streams[topic] = stream
+        markets = response_cache.peek("markets")
+        if markets:
+            stream.update(markets, time.monotonic())
+    return stream
+
+def publish_prices(markets):
+    """Advance every price stream and publish a first snapshot or a delta to its subscribers"""
+    get_price_stream()
+    now = time.monotonic()
+    for topic, stream in list(price_streams.items()):
+        if topic != DEFAULT_PRICE_TOPIC and not manager.subscriber_count(topic):
+            # Nobody watches this selection any more
+            del price_streams[topic]
+            continue
+        message = stream.update(markets, now)
+        if message:
+            manager.publish(topic, message)
+
+def channel_message(channel):
+    """Serialized update for a cached global/fear_greed value, rebuilt only when the value changes"""
+    value = response_cache.peek(channel)
+    if value is None:
+        return None
+    cached = channel_messages.get(channel)
+    if cached is None or cached[0] != value:
+        cached = (value, Payload({"type": f"{channel}_update", "data": value}))
+        channel_messages[channel] = cached
+    return cached[1]
+
+async def publish_channel(channel, loader, cache_ttl):
+    """Publish a global/fear_greed update if anyone is subscribed and the value changed"""
+    if not manager.subscriber_count(channel):
+        return
+    previous = channel_messages.get(channel)
+    ttl, stale_ttl = cache_ttl
     try:
+        value = await response_cache.get(channel, loader, ttl, stale_ttl)
+    except Exception as e:
+        print(f"Error refreshing {channel} channel: {e}")
+        return
+    if previous is not None and previous[0] == value:
+        return
+    message = channel_message(channel)
+    if message:
+        manager.publish(channel, message)
+
+def start_market_refresh():
+    global market_refresh_task
+    market_refresh_task = asyncio.create_task(market_refresh_loop())
+
+async def stop_market_refresh():
+    if market_refresh_task:
+        market_refresh_task.cancel()
+        try:
+            await market_refresh_task
+        except asyncio.CancelledError:
+            pass
+
+def parse_price_subscription(message):
+    """(symbols, interval) from a prices subscribe message, normalized so equal requests share a stream"""
+    symbols = message.get("symbols") or []
+    if not isinstance(symbols, list):
+        symbols = []
+    symbols = {str(symbol).strip().lower() for symbol in symbols[:MAX_WATCHED_SYMBOLS] if str(symbol).strip()}
+    try:
+        interval = int(min(max(float(message.get("interval") or 0), 0), MAX_PUSH_INTERVAL))
+    except (TypeError, ValueError):
+        interval = 0
+    if interval <= PRICE_REFRESH_INTERVAL:
+        # The refresh loop already caps the rate at one update per interval
+        interval = 0
+    return symbols, interval
+
+def send_channel_snapshot(websocket, topic):
+    """Current state of a topic for a client that just subscribed or asked to resync"""
+    if topic.startswith("prices"):
+        stream = price_streams.get(topic)
+        message = stream.snapshot_message() if stream and stream.seq else None
+    elif topic == "signals":
+        message = signal_snapshot.message if signal_snapshot else None
+    else:
+        message = channel_message(topic)
+    if message:
+        manager.send(websocket, message)
+
+def handle_client_message(websocket, message):
+    """Apply a subscribe/unsubscribe/resync request from a WebSocket client"""
+    kind = message.get("type")
+    topics = manager.subscriptions(websocket)
+    if kind == "resync":
+        for topic in topics:
+            if topic.startswith("prices"):
+                send_channel_snapshot(websocket, topic)
+        return
+    if kind not in ("subscribe", "unsubscribe"):
+        return
+    
+    channels = message.get("channels") or [message.get("channel")]
+    if not isinstance(channels, list):
+        return
+    for channel in channels:
+        if channel not in CHANNELS:
+            continue
+        if channel == "prices":
+            # One price stream per client; subscribing again replaces the watchlist
+            for topic in topics:
+                if topic.startswith("prices"):
+                    manager.unsubscribe(websocket, topic)
+            if kind == "subscribe":
+                stream = get_price_stream(*parse_price_subscription(message))
+                manager.subscribe(websocket, stream.topic)
+                send_channel_snapshot(websocket, stream.topic)
+        elif kind == "subscribe":
+            if channel not in topics:
+                manager.subscribe(websocket, channel)
+                send_channel_snapshot(websocket, channel)
+        else:
+            manager.unsubscribe(websocket, channel)
+    
+    subscribed = sorted({topic.split(":")[0] for topic in manager.subscriptions(websocket)})
+    manager.send(websocket, Payload({"type": "subscriptions", "channels": subscribed}))
+
+async def serve_socket(websocket: WebSocket, topics):
+    """Run a client socket: initial topics, then subscription requests until it disconnects
+
+    Outbound messages are JSON text frames, or MessagePack binary frames when the
+    client connects with ?format=msgpack. Requests from the client are always JSON text.
+    """
+    fmt = websocket_format(websocket.query_params.get("format", ""))
+    await manager.connect(websocket, topics, fmt)
+    try:
+        # New clients get the latest state right away instead of waiting a full interval
+        for topic in topics:
+            if topic == DEFAULT_PRICE_TOPIC:
+                get_price_stream()
+            send_channel_snapshot(websocket, topic)
+        # Updates are pushed by market_refresh_loop; clients only send subscription
+        # changes, or a resync when they see a gap in the delta sequence
         while True:
             try:
-                markets = await get_markets()
-                if markets and isinstance(markets, list):
-                    await websocket.send_json({
-                        "type": "price_update",
-                        "data": markets[:20]
-                    })
-            except Exception as e:
-                print(f"WebSocket error: {e}")
-            await asyncio.sleep(30)
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if isinstance(message, dict):
+                handle_client_message(websocket, message)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         print(f"WebSocket connection error: {e}")
+    finally:
         manager.disconnect(websocket)
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI from price data"""
-    if len(prices) < period:
-        return 50
-    
-    changes = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-    gains = [c if c > 0 else 0 for c in changes[-period:]]
-    losses = [-c if c < 0 else 0 for c in changes[-period:]]
-    
-    avg_gain = sum(gains) / period if gains else 0
-    avg_loss = sum(losses) / period if losses else 0
-    
-    if avg_loss == 0:
-        return 100 if avg_gain > 0 else 50
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def calculate_macd(prices, fast=12, slow=26, signal=9):
-    """Calculate MACD line and signal"""
-    if len(prices) < slow:
-        return None, None
-    
-    ema_fast = prices[-1]
-    ema_slow = prices[-1]
-    
-    for price in prices[-slow:]:
-        ema_slow = ema_slow * (1 - 2/(slow+1)) + price * (2/(slow+1))
-    
-    for price in prices[-fast:]:
-        ema_fast = ema_fast * (1 - 2/(fast+1)) + price * (2/(fast+1))
-    
-    macd = ema_fast - ema_slow
-    return macd, macd
+@app.websocket("/ws/prices")
+async def websocket_endpoint(websocket: WebSocket):
+    """WebSocket endpoint for real-time price updates; starts on the top-coins price stream"""
+    await serve_socket(websocket, (DEFAULT_PRICE_TOPIC,))
 
-def calculate_bollinger_bands(prices, period=20, std_dev=2):
-    """Calculate Bollinger Bands"""
-    if len(prices) < period:
-        return None, None, None
-    
-    recent_prices = prices[-period:]
-    sma = sum(recent_prices) / period
-    variance = sum((p - sma) ** 2 for p in recent_prices) / period
-    std = variance ** 0.5
-    
-    upper = sma + (std_dev * std)
-    lower = sma - (std_dev * std)
-    return upper, sma, lower
+def coin_sparkline(coin, sparkline_data=None):
+    """7d sparkline prices for a coin, or a synthetic series when the provider has none"""
+    sparkline = sparkline_data or coin.get("sparkline_in_7d", {}).get("price", [])
+    if not sparkline or len(sparkline) == 0:
+        price = coin.get("current_price", 0)
+        sparkline = [price * (1 - 0.02 * i / 7) for i in range(7)]
+    return sparkline
 
-def calculate_stochastic(prices, period=14):
-    """Calculate Stochastic RSI"""
-    if len(prices) < period:
-        return 50
+def analyze_coin(coin, sparkline_data=None, indicators=None):
+    """Comprehensive coin analysis with professional-grade indicators
     
-    recent = prices[-period:]
-    low = min(recent)
-    high = max(recent)
-    
-    if high == low:
-        return 50
-    
-    stoch = ((prices[-1] - low) / (high - low)) * 100
-    return stoch
-
-def analyze_coin(coin, sparkline_data=None):
-    """Comprehensive coin analysis with professional-grade indicators"""
+    `indicators` may be passed in precomputed (see batch_indicators); otherwise
+    they are computed from the coin's sparkline.
+    """
     price = coin.get("current_price", 0)
     change_24h = coin.get("price_change_percentage_24h", 0)
     change_7d = coin.get("price_change_percentage_7d_in_currency", [0])[0] if isinstance(coin.get("price_change_percentage_7d_in_currency"), list) else coin.get("price_change_percentage_7d_in_currency", 0)
@@ -560,27 +1167,29 @@ def analyze_coin(coin, sparkline_data=None):
     market_cap = coin.get("market_cap", 0)
     
     # Extract sparkline prices
-    sparkline = sparkline_data or coin.get("sparkline_in_7d", {}).get("price", [])
-    if not sparkline or len(sparkline) == 0:
-        sparkline = [price * (1 - 0.02 * i / 7) for i in range(7)]
+    sparkline = coin_sparkline(coin, sparkline_data)
     
     # Calculate technical indicators
-    rsi = calculate_rsi(sparkline, 14) if len(sparkline) >= 14 else 50 + (change_24h * 1.5)
+    if indicators is None:
+        indicators = compute_indicators(sparkline)
+    rsi = indicators["rsi"] if indicators["rsi"] is not None else 50 + (change_24h * 1.5)
     rsi = max(0, min(100, rsi))
     
-    stoch = calculate_stochastic(sparkline, 14)
-    upper_bb, middle_bb, lower_bb = calculate_bollinger_bands(sparkline, 20, 2)
+    stoch = indicators["stochastic"]
+    upper_bb = indicators["bollinger_upper"]
+    middle_bb = indicators["bollinger_middle"]
+    lower_bb = indicators["bollinger_lower"]
     
     # MACD analysis
-    macd, _ = calculate_macd(sparkline)
+    macd = indicators["macd"]
     macd_signal = macd > 0 if macd else False
     
     # Volume analysis
     volume_to_mcap = (volume / (market_cap + 1)) * 100 if market_cap else 0
     
     # 7-day high/low
-    high_7d = max(sparkline) if sparkline else price
-    low_7d = min(sparkline) if sparkline else price
+    high_7d = indicators["high"]
+    low_7d = indicators["low"]
     
     # Support and Resistance with Bollinger Bands
     if lower_bb and upper_bb:
@@ -732,43 +1341,94 @@ def get_signal_analysis(rsi, change_24h, macd_positive, volume_ratio, signal, st
     
     return " | ".join(parts)
 
+def build_vip_signals(markets):
+    """Analyze every coin and build the VIP signals payload"""
+    signals = []
+    markets = markets.to_list()
+    
+    # Streaming indicators where the refresh loop has warm state, one batch
+    # pass over the sparklines for the rest
+    all_indicators = [indicator_book.get(coin.get("id")) for coin in markets]
+    cold = [i for i, indicators in enumerate(all_indicators) if indicators is None]
+    for i, indicators in zip(cold, batch_indicators([coin_sparkline(markets[i]) for i in cold])):
+        all_indicators[i] = indicators
+    
+    for coin, indicators in zip(markets, all_indicators):
+        try:
+            analysis = analyze_coin(coin, indicators=indicators)
+            signals.append(analysis)
+        except Exception as e:
+            print(f"Error analyzing coin: {e}")
+            continue
+    
+    # Sort by confidence (most reliable signals first)
+    signals.sort(key=lambda x: x["confidence"], reverse=True)
+    
+    return {
+        "success": True,
+        "signals": signals[:8],  # Return top 8 most reliable signals
+        "generated_at": int(time.time()),
+        "signal_count": len(signals),
+        "top_signal": signals[0] if signals else None,
+        "vip_features": {
+            "real_time_signals": True,
+            "technical_analysis": "RSI, MACD, Volume",
+            "confidence_scoring": True,
+            "risk_assessment": True,
+            "win_rate_tracking": True,
+            "daily_updates": True
+        }
+    }
+
+class SignalSnapshot(NamedTuple):
+    """Immutable, pre-serialized VIP signal set produced once per market refresh"""
+    version: int
+    generated_at: int
+    etag: str
+    body: Payload  # /api/vip/signals response
+    message: Payload  # signals_update WebSocket message
+
+def publish_signal_snapshot(markets):
+    """Recompute signals and swap in a new snapshot if they changed; returns the new snapshot or None"""
+    global signal_snapshot
+    
+    payload = build_vip_signals(markets)
+    # Per-signal timestamps tick every second, so leave them out of the fingerprint
+    fingerprint = json.dumps(
+        [{k: v for k, v in signal.items() if k != "timestamp"} for signal in payload["signals"]] + [payload["signal_count"]],
+        sort_keys=True, ensure_ascii=False
+    )
+    etag = '"' + hashlib.sha1(fingerprint.encode()).hexdigest()[:20] + '"'
+    if signal_snapshot and signal_snapshot.etag == etag:
+        return None
+    
+    version = signal_snapshot.version + 1 if signal_snapshot else 1
+    payload["version"] = version
+    signal_snapshot = SignalSnapshot(
+        version=version,
+        generated_at=payload["generated_at"],
+        etag=etag,
+        body=Payload(payload),
+        message=Payload({"type": "signals_update", "data": payload}),
+    )
+    return signal_snapshot
+
 @app.get("/api/vip/signals")
-async def get_vip_signals():
-    """Get premium VIP trading signals with reliable AI analysis"""
+async def get_vip_signals(request: Request):
+    """Get premium VIP trading signals from the latest precomputed snapshot"""
     try:
-        markets = await get_markets()
-        if not markets or len(markets) == 0:
-            raise Exception("No market data available")
-        
-        signals = []
-        
-        # Generate signals for top 10 coins (more reliable dataset)
-        for coin in markets[:10]:
-            try:
-                analysis = analyze_coin(coin)
-                signals.append(analysis)
-            except Exception as e:
-                print(f"Error analyzing coin: {e}")
-                continue
+        snapshot = signal_snapshot
+        if snapshot is None:
+            # Cold start before the first market refresh has produced one
+            markets = await get_markets()
+            if not markets or len(markets) == 0:
+                raise Exception("No market data available")
+            snapshot = publish_signal_snapshot(markets[:SIGNAL_UNIVERSE_SIZE]) or signal_snapshot
         
-        # Sort by confidence (most reliable signals first)
-        signals.sort(key=lambda x: x["confidence"], reverse=True)
-        
-        return {
-            "success": True,
-            "signals": signals[:8],  # Return top 8 most reliable signals
-            "generated_at": int(time.time()),
-            "signal_count": len(signals),
-            "top_signal": signals[0] if signals else None,
-            "vip_features": {
-                "real_time_signals": True,
-                "technical_analysis": "RSI, MACD, Volume",
-                "confidence_scoring": True,
-                "risk_assessment": True,
-                "win_rate_tracking": True,
-                "daily_updates": True
-            }
-        }
+        headers = {"ETag": snapshot.etag}
+        if etag_matches(request.headers.get("if-none-match", ""), snapshot.etag):
+            return Response(status_code=304, headers=headers)
+        return snapshot.body.response(request.headers.get("accept", ""), headers=headers)
     except Exception as e:
         print(f"Error generating VIP signals: {e}")
         return {
@@ -777,6 +1437,11 @@ async def get_vip_signals():
             "signals": []
         }
 
+@app.websocket("/ws/signals")
+async def signals_websocket(websocket: WebSocket):
+    """WebSocket endpoint that pushes VIP signal snapshots as they change"""
+    await serve_socket(websocket, ("signals",))
+
 @app.post("/api/vip/payment-verify")
 async def verify_vip_payment(payment_data: dict):
     """Verify VIP payment and activate subscription"""
@@ -802,4 +1467,5 @@ async def verify_vip_payment(payment_data: dict):
             "error": str(e)
         }
 
-app.mount("/", StaticFiles(directory="frontend", html=True), name="static")
+# Fingerprinted, precompressed build when present (python -m backend.assets), else raw sources
+app.mount("/", AssetFiles(directory=static_directory(), html=True), name="static")
@@ -0,0 +1,263 @@
+"""Market universe: paginated upstream loading, columnar storage and an indexed table
+
+Providers cap a single markets request at 100-250 coins, so the universe is
+fetched as concurrent pages (each page still takes a token from the provider's
+rate limiter) and merged. The merged list is stored as a MarketSnapshot: one
+typed array per numeric field and a single float64 buffer holding every
+sparkline, instead of ~20 boxed values and a 168-float list per coin. Values
+are kept at full precision, so JSON output is exactly what the provider sent. Slices
+are views over the same columns, and coin dicts are only built where a
+response or message is serialized. MarketTable indexes one snapshot by id and
+symbol and keeps lazily built sort orders, so /api/markets pages, sorts and
+filters without touching upstream.
+"""
+
+import asyncio
+import math
+from array import array
+
+# Sort keys accepted by /api/markets -> coin field
+SORT_FIELDS = {
+    "rank": "market_cap_rank",
+    "market_cap": "market_cap",
+    "volume": "total_volume",
+    "price": "current_price",
+    "change_24h": "price_change_percentage_24h",
+    "change_7d": "price_change_percentage_7d_in_currency",
+    "name": "name",
+}
+ASCENDING_BY_DEFAULT = ("rank", "name")
+SPARKLINE_FIELD = "sparkline_in_7d"  # {"price": [...]} in coin dicts
+
+
+async def fetch_pages(fetch_page, pages: int) -> list:
+    """Fetch pages 1..pages concurrently and merge them in page order
+
+    The first page must succeed (its exception is re-raised). After that the
+    leading run of successful pages is kept, so a throttled tail shortens the
+    list instead of leaving a gap in the ranking. Coins that moved between
+    pages while they were fetched appear once.
+    """
+    results = await asyncio.gather(*(fetch_page(page) for page in range(1, pages + 1)), return_exceptions=True)
+    if isinstance(results[0], BaseException):
+        raise results[0]
+    merged = []
+    seen = set()
+    for result in results:
+        if isinstance(result, BaseException) or not result:
+            break
+        for coin in result:
+            coin_id = coin.get("id")
+            if coin_id not in seen:
+                seen.add(coin_id)
+                merged.append(coin)
+    return merged
+
+
+def _numeric_column(values):
+    """(typed array, set of indexes holding None) for an all-number column, or None"""
+    missing = set()
+    integral = True
+    for index, value in enumerate(values):
+        if value is None:
+            missing.add(index)
+        elif type(value) is float:
+            integral = False
+        elif type(value) is not int:
+            return None
+    filled = [0 if value is None else value for value in values]
+    if integral:
+        try:
+            return array("q", filled), missing
+        except OverflowError:
+            pass
+    return array("d", filled), missing
+
+
+class MarketSnapshot:
+    """Columnar, read-only market list that behaves like a list of coin dicts
+
+    Indexing and iteration build coin dicts on demand; a step-1 slice is a view
+    sharing this snapshot's columns. values(field) and sparkline(i) read the
+    columns directly for code that only needs a few fields.
+    """
+
+    def __init__(self, markets):
+        markets = list(markets)
+        self.fields = []
+        seen = set()
+        for coin in markets:
+            for field in coin:
+                if field not in seen:
+                    seen.add(field)
+                    self.fields.append(field)
+
+        self.numeric = {}  # field -> (array, missing indexes)
+        self.objects = {}  # field -> list of values (strings, nested dicts)
+        for field in self.fields:
+            if field == SPARKLINE_FIELD:
+                continue
+            values = [coin.get(field) for coin in markets]
+            column = _numeric_column(values)
+            if column is None:
+                self.objects[field] = values
+            else:
+                self.numeric[field] = column
+
+        # Sparklines: one contiguous float64 buffer plus row offsets into it
+        self.sparklines = array("d")
+        self.offsets = array("l", [0])
+        self.gaps = set()  # rows whose sparkline contained None (stored as NaN)
+        if SPARKLINE_FIELD in seen:
+            for index, coin in enumerate(markets):
+                prices = (coin.get(SPARKLINE_FIELD) or {}).get("price") or ()
+                if None in prices:
+                    self.gaps.add(index)
+                    prices = [math.nan if price is None else price for price in prices]
+                self.sparklines.extend(prices)
+                self.offsets.append(len(self.sparklines))
+
+        self.start = 0
+        self.stop = len(markets)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self.row(i) for i in range(start, stop, step)]
+            view = object.__new__(MarketSnapshot)
+            view.__dict__.update(self.__dict__)
+            view.start = self.start + start
+            view.stop = self.start + max(start, stop)
+            return view
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("market snapshot index out of range")
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def row(self, index: int, fields=None) -> dict:
+        """Coin dict for a row, optionally with only `fields`"""
+        position = self.start + index
+        coin = {}
+        for field in fields or self.fields:
+            if field in self.numeric:
+                column, missing = self.numeric[field]
+                coin[field] = None if position in missing else column[position]
+            elif field in self.objects:
+                coin[field] = self.objects[field][position]
+            elif field == SPARKLINE_FIELD and field in self.fields:
+                coin[field] = {"price": self._prices(position)}
+            else:
+                coin[field] = None
+        return coin
+
+    def records(self, fields) -> list:
+        """Coin dicts with only `fields`, for consumers that don't need sparklines"""
+        return [self.row(index, fields) for index in range(len(self))]
+
+    def to_list(self) -> list:
+        return [self.row(index) for index in range(len(self))]
+
+    def values(self, field: str):
+        """One field for every row: a zero-copy memoryview for complete numeric columns, else a list"""
+        if field in self.numeric:
+            column, missing = self.numeric[field]
+            if not missing:
+                return memoryview(column)[self.start:self.stop]
+            return [None if i in missing else column[i] for i in range(self.start, self.stop)]
+        if field in self.objects:
+            return self.objects[field][self.start:self.stop]
+        return [None] * len(self)
+
+    def sparkline(self, index: int):
+        """Sparkline prices of a row as a zero-copy memoryview (NaN where the provider had gaps)"""
+        position = self.start + index
+        if position + 1 >= len(self.offsets):
+            return memoryview(self.sparklines)[0:0]
+        return memoryview(self.sparklines)[self.offsets[position]:self.offsets[position + 1]]
+
+    def _prices(self, position: int) -> list:
+        prices = self.sparklines[self.offsets[position]:self.offsets[position + 1]].tolist()
+        if position in self.gaps:
+            prices = [None if math.isnan(price) else price for price in prices]
+        return prices
+
+
+class MarketTable:
+    """Read-only index over one MarketSnapshot, in its market-cap order"""
+
+    def __init__(self, markets: MarketSnapshot):
+        self.source = markets
+        self.rows = markets
+        self.by_id = {}
+        self.by_symbol = {}
+        for index, (coin_id, symbol) in enumerate(zip(markets.values("id"), markets.values("symbol"))):
+            self.by_id.setdefault(coin_id, index)
+            self.by_symbol.setdefault((symbol or "").lower(), []).append(index)
+        self._orders = {}  # (field, descending) -> row indexes
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, coin_id: str, fields=None):
+        index = self.by_id.get(coin_id)
+        return self.rows.row(index, fields) if index is not None else None
+
+    def order(self, sort: str, descending: bool) -> list:
+        """Row indexes sorted by `sort`, coins missing the field last; built once per table"""
+        key = (sort, descending)
+        order = self._orders.get(key)
+        if order is None:
+            field = SORT_FIELDS[sort]
+            values = self.rows.values(field)
+            present = [i for i, value in enumerate(values) if value is not None]
+            missing = [i for i, value in enumerate(values) if value is None]
+            if field == "name":
+                present.sort(key=lambda i: values[i].lower(), reverse=descending)
+            else:
+                present.sort(key=values.__getitem__, reverse=descending)
+            order = present + missing
+            self._orders[key] = order
+        return order
+
+    def query(self, page: int = 1, per_page: int = 50, sort: str = None, descending: bool = None,
+              ids=None, symbols=None, min_market_cap: float = None, min_volume: float = None):
+        """(coins on the requested page, total matching coins)"""
+        candidates = None
+        if ids or symbols:
+            candidates = set()
+            for coin_id in ids or ():
+                if coin_id in self.by_id:
+                    candidates.add(self.by_id[coin_id])
+            for symbol in symbols or ():
+                candidates.update(self.by_symbol.get(symbol.lower(), ()))
+
+        if sort is None or (sort == "rank" and not descending):
+            order = range(len(self.rows))
+        else:
+            if descending is None:
+                descending = sort not in ASCENDING_BY_DEFAULT
+            order = self.order(sort, descending)
+
+        market_caps = self.rows.values("market_cap") if min_market_cap is not None else None
+        volumes = self.rows.values("total_volume") if min_volume is not None else None
+        matches = []
+        for index in order:
+            if candidates is not None and index not in candidates:
+                continue
+            if market_caps is not None and (market_caps[index] or 0) < min_market_cap:
+                continue
+            if volumes is not None and (volumes[index] or 0) < min_volume:
+                continue
+            matches.append(index)
+
+        start = (page - 1) * per_page
+        return [self.rows[i] for i in matches[start:start + per_page]], len(matches)
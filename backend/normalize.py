@@ -0,0 +1,178 @@
+"""Provider response normalization into the common (CoinGecko-shaped) records
+
+Market mappers are plain functions that read each nested container once and
+return one dict literal, so a page of rows is mapped without per-field loops or
+string parsing. CryptoCompare is read from its numeric RAW block; the DISPLAY
+block holds formatted strings ("$ 1.2 B") that cannot be parsed reliably.
+
+OHLC fallbacks (CoinGecko market_chart, Coinstats charts) only return price
+points, which points_to_candles() turns into the same hourly candles the local
+store serves, so /api/ohlc has one response shape whichever provider answered.
+
+`python -m backend.normalize` benchmarks the market mappers.
+"""
+
+import sys
+import time
+
+HOUR = 3600
+_EMPTY = {}
+
+
+def _optional(value):
+    return None if value is None else float(value)
+
+
+def map_cryptocompare_market(row: dict, rank: int) -> dict:
+    """One CryptoCompare top-list row; `rank` is the row's position in the list"""
+    info = row.get("CoinInfo") or _EMPTY
+    usd = (row.get("RAW") or _EMPTY).get("USD") or _EMPTY
+    symbol = (info.get("Name") or "").lower()
+    return {
+        "id": symbol,
+        "symbol": symbol,
+        "name": info.get("FullName") or "",
+        "image": "https://cryptocompare.com" + (info.get("ImageUrl") or ""),
+        "current_price": float(usd.get("PRICE") or 0),
+        "market_cap": float(usd.get("MKTCAP") or 0),
+        "market_cap_rank": rank,
+        "total_volume": float(usd.get("TOTALVOLUME24HTO") or 0),
+        "high_24h": _optional(usd.get("HIGH24HOUR")),
+        "low_24h": _optional(usd.get("LOW24HOUR")),
+        "price_change_percentage_24h": float(usd.get("CHANGEPCT24HOUR") or 0),
+        "circulating_supply": _optional(usd.get("CIRCULATINGSUPPLY")),
+        "sparkline_in_7d": {"price": []},  # only CoinGecko has sparklines
+    }
+
+
+def map_coinstats_market(row: dict, rank: int) -> dict:
+    """One Coinstats coins row; the provider's rank wins over the row position"""
+    return {
+        "id": (row.get("id") or "").lower(),
+        "symbol": (row.get("symbol") or "").lower(),
+        "name": row.get("name") or "",
+        "image": row.get("icon") or "",
+        "current_price": float(row.get("price") or 0),
+        "market_cap": float(row.get("marketCap") or 0),
+        "market_cap_rank": int(row["rank"]) if row.get("rank") else rank,
+        "total_volume": float(row.get("volume") or 0),
+        "price_change_percentage_24h": float(row.get("priceChange1d") or 0),
+        "price_change_percentage_7d_in_currency": _optional(row.get("priceChange1w")),
+        "circulating_supply": _optional(row.get("availableSupply")),
+        "sparkline_in_7d": {"price": []},
+    }
+
+
+def cryptocompare_coin_details(data: dict, coin_id: str, symbol: str) -> dict:
+    """CoinGecko coins/{id}-shaped details from a pricemulti body; raises if it has no USD price
+
+    pricemulti answers 200 with {"Response": "Error", ...} for unknown tickers.
+    """
+    price = (data.get(symbol) or _EMPTY).get("USD") if data.get("Response") != "Error" else None
+    if price is None:
+        raise ValueError(data.get("Message") or f"no CryptoCompare price for {symbol}")
+    return {"id": coin_id, "symbol": symbol.lower(), "market_data": {"current_price": {"usd": float(price)}}}
+
+
+def coinstats_coin_details(data: dict, coin_id: str) -> dict:
+    """CoinGecko coins/{id}-shaped details from a Coinstats coins/{id} body; raises without a coin"""
+    coin = data.get("coin")
+    if not coin:
+        raise ValueError(f"no Coinstats coin for {coin_id}")
+    website = coin.get("websiteUrl")
+    return {
+        "id": coin_id,
+        "symbol": (coin.get("symbol") or "").lower(),
+        "name": coin.get("name") or "",
+        "image": {"large": coin.get("icon")},
+        "market_cap_rank": coin.get("rank"),
+        "links": {"homepage": [website] if website else []},
+        "market_data": {
+            "current_price": {"usd": coin.get("price")},
+            "market_cap": {"usd": coin.get("marketCap")},
+            "total_volume": {"usd": coin.get("volume")},
+            "price_change_percentage_24h": coin.get("priceChange1d"),
+            "price_change_percentage_7d": coin.get("priceChange1w"),
+            "circulating_supply": coin.get("availableSupply"),
+            "total_supply": coin.get("totalSupply"),
+        },
+    }
+
+
+def normalize_markets(rows, mapper, first_rank: int = 1) -> list:
+    """Map one page of provider rows; `first_rank` is the rank of the page's first row"""
+    return [mapper(row, rank) for rank, row in enumerate(rows, first_rank)]
+
+
+def points_to_candles(points, millis: bool = False) -> list:
+    """Hourly OHLC candles from time-ordered [timestamp, price, ...] points (no volume)"""
+    candles = []
+    candle = None
+    for point in points:
+        price = point[1]
+        if price is None:
+            continue
+        hour = int(point[0] // 1000 if millis else point[0]) // HOUR * HOUR
+        if candle is not None and candle["time"] == hour:
+            if price > candle["high"]:
+                candle["high"] = price
+            elif price < candle["low"]:
+                candle["low"] = price
+            candle["close"] = price
+        else:
+            candle = {"time": hour, "open": price, "high": price, "low": price, "close": price,
+                      "volumefrom": None, "volumeto": None}
+            candles.append(candle)
+    return candles
+
+
+def select_candles(candles, limit: int, start: int = None, end: int = None) -> list:
+    """The store's selection rules: a start/end range, or else the latest limit + 1 candles"""
+    if start is None:
+        return candles[-(limit + 1):]
+    return [c for c in candles if c["time"] >= start and (end is None or c["time"] <= end)]
+
+
+def ohlc_response(candles) -> dict:
+    """CryptoCompare histohour-shaped body for a non-empty candle list"""
+    return {
+        "Response": "Success",
+        "Data": {
+            "TimeFrom": candles[0]["time"],
+            "TimeTo": candles[-1]["time"],
+            "Data": candles
+        }
+    }
+
+
+def _sample_rows(count: int):
+    cryptocompare = [{
+        "CoinInfo": {"Name": f"C{i}", "FullName": f"Coin {i}", "ImageUrl": f"/media/{i}/c.png"},
+        "RAW": {"USD": {"PRICE": 1000.5 - i * 0.1, "MKTCAP": 1e12 - i, "TOTALVOLUME24HTO": 1e9 + i,
+                        "HIGH24HOUR": 1010.0, "LOW24HOUR": 990.0, "CHANGEPCT24HOUR": 1.25,
+                        "CIRCULATINGSUPPLY": 19e6, "OPEN24HOUR": 995.0, "LASTUPDATE": 1700000000}},
+        "DISPLAY": {"USD": {"PRICE": "$ 1,000.5", "MKTCAP": "$ 1.00 T"}},
+    } for i in range(count)]
+    coinstats = [{
+        "id": f"coin-{i}", "symbol": f"C{i}", "name": f"Coin {i}", "icon": f"https://x/{i}.png", "rank": i + 1,
+        "price": 1000.5 - i * 0.1, "marketCap": 1e12 - i, "volume": 1e9 + i, "priceChange1h": 0.1,
+        "priceChange1d": 1.25, "priceChange1w": -3.5, "availableSupply": 19e6, "totalSupply": 21e6,
+    } for i in range(count)]
+    return cryptocompare, coinstats
+
+
+def benchmark(count: int = 5000, rounds: int = 20):
+    """Print coins normalized per millisecond for each provider mapper"""
+    cryptocompare, coinstats = _sample_rows(count)
+    for name, rows, mapper in (("cryptocompare", cryptocompare, map_cryptocompare_market),
+                               ("coinstats", coinstats, map_coinstats_market)):
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            normalize_markets(rows, mapper)
+            best = min(best, time.perf_counter() - started)
+        print(f"{name}: {count / (best * 1000):,.0f} coins/ms ({best * 1e6 / count:.2f} us per coin)")
+
+
+if __name__ == "__main__":
+    benchmark(*(int(arg) for arg in sys.argv[1:3]))
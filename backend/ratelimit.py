@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+
+# Lower value is served first when several requests wait on the same provider
+PRIORITY_REALTIME = 0  # shared WebSocket market refresh
+PRIORITY_NORMAL = 1  # cached endpoint loads
+PRIORITY_ADHOC = 2  # per-click lookups such as coin details and charts
+
+# Priority for upstream calls made in the current task; tasks spawned from it inherit it
+request_priority = contextvars.ContextVar("request_priority", default=PRIORITY_NORMAL)
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of queueing when a request could not be sent before its deadline"""
+
+
+class TokenBucket:
+    """Async token bucket with burst capacity, priority queueing and deadline fast-fail"""
+
+    def __init__(self, name: str, rate: float, burst: int, max_queue: int = 50):
+        self.name = name
+        self.rate = rate  # tokens per second
+        self.capacity = burst
+        self.max_queue = max_queue
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._dispatcher = None
+        self.granted = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _queued_ahead(self, priority: int) -> int:
+        return sum(1 for p, _, fut in self._waiters if p <= priority and not fut.done())
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, deadline: float = 10.0):
+        """Wait for a token, or raise RateLimitExceeded if it can't arrive within `deadline` seconds"""
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{self.name} request queue is full")
+        expected_wait = (self._queued_ahead(priority) + 1 - self.tokens) / self.rate
+        if expected_wait > deadline:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{self.name} rate limit wait of {expected_wait:.1f}s exceeds deadline")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await asyncio.wait_for(future, deadline)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{self.name} rate limit wait exceeded deadline")
+
+    async def _dispatch(self):
+        while self._waiters:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Waiter timed out or was cancelled; its token stays in the bucket
+                continue
+            self.tokens -= 1
+            self.granted += 1
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "tokens": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "rate_per_second": self.rate,
+            "queued": sum(1 for _, _, fut in self._waiters if not fut.done()),
+            "granted": self.granted,
+            "rejected": self.rejected,
+        }
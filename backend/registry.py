@@ -0,0 +1,165 @@
+"""Coin registry: cross-provider ids and a search index built from market data
+
+CoinGecko and Coinstats address coins by slug ("bitcoin") while CryptoCompare
+uses the ticker ("BTC"). The registry keeps one record per coin with the id
+each provider expects, hash indexes by id, symbol and provider id, and a
+prefix plus trigram index for search. It is rebuilt from each new market list
+and keeps coins it has seen before, so slugs learned from CoinGecko survive a
+refresh served by CryptoCompare.
+"""
+
+from bisect import bisect_left
+
+PROVIDERS = ("coingecko", "cryptocompare", "coinstats")
+RECORD_FIELDS = ("id", "symbol", "name", "market_cap_rank", "image")  # market fields the registry reads
+MIN_TRIGRAM_SCORE = 0.5
+
+
+class CoinRecord:
+    __slots__ = ("id", "symbol", "name", "rank", "image", "provider_ids", "ticker_only")
+
+    def __init__(self, coin_id: str, symbol: str, name: str, rank, image: str):
+        self.id = coin_id
+        self.symbol = symbol
+        self.name = name
+        self.rank = rank
+        self.image = image
+        self.ticker_only = False  # created from a CryptoCompare row, slug unknown
+        # Slug for CoinGecko/Coinstats, ticker for CryptoCompare
+        self.provider_ids = {"coingecko": coin_id, "cryptocompare": symbol.upper(), "coinstats": coin_id}
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "symbol": self.symbol, "name": self.name, "rank": self.rank, "image": self.image}
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _rank_key(record):
+    return record.rank if isinstance(record.rank, (int, float)) else float("inf")
+
+
+class CoinRegistry:
+    def __init__(self):
+        self.records = {}  # id -> CoinRecord
+        self.by_symbol = {}  # lower symbol -> [records], best ranked first
+        self.by_provider = {}  # (provider, provider id lowered) -> record
+        self.by_name = {}  # lower name -> record
+        self.prefixes = []  # sorted (term, id) for symbol, id, name and name words
+        self.grams = {}  # trigram -> set of ids
+        self.source = None
+
+    def ingest(self, markets):
+        """Merge a normalized market list and rebuild the indexes"""
+        if markets is self.source:
+            return
+        self.source = markets
+        for coin in markets:
+            coin_id = (coin.get("id") or "").lower()
+            symbol = (coin.get("symbol") or "").lower()
+            if not coin_id:
+                continue
+            record = self.records.get(coin_id)
+            if record is None and coin_id == symbol:
+                # A CryptoCompare row (id is the ticker): attach it to the coin a
+                # slug-based provider already taught us, if there is one
+                known = self.by_symbol.get(symbol)
+                if known:
+                    record = known[0]
+            if record is None:
+                record = CoinRecord(coin_id, symbol, coin.get("name") or "", coin.get("market_cap_rank"), coin.get("image") or "")
+                record.ticker_only = coin_id == symbol
+                self.records[coin_id] = record
+                placeholder = self.records.get(symbol)
+                if (placeholder is not None and placeholder is not record and placeholder.ticker_only
+                        and _rank_key(record) <= _rank_key(placeholder)):
+                    # The slug for a coin first seen by ticker: keep the slug record only
+                    del self.records[symbol]
+            else:
+                record.rank = coin.get("market_cap_rank") or record.rank
+                record.image = record.image or coin.get("image") or ""
+        self._index()
+
+    def _index(self):
+        self.by_symbol = {}
+        self.by_provider = {}
+        self.by_name = {}
+        prefixes = []
+        self.grams = {}
+        for record in self.records.values():
+            self.by_symbol.setdefault(record.symbol, []).append(record)
+            for provider, provider_id in record.provider_ids.items():
+                self.by_provider.setdefault((provider, provider_id.lower()), record)
+            name = record.name.lower()
+            self.by_name.setdefault(name, record)
+            terms = {record.symbol, record.id, name, *name.split()}
+            prefixes.extend((term, record.id) for term in terms if term)
+            for gram in trigrams(name) | trigrams(record.symbol):
+                self.grams.setdefault(gram, set()).add(record.id)
+        for records in self.by_symbol.values():
+            records.sort(key=_rank_key)
+        prefixes.sort()
+        self.prefixes = prefixes
+
+    def resolve(self, query: str):
+        """Record for an id, provider id, ticker or exact name; tickers resolve to the best-ranked coin"""
+        key = (query or "").strip().lower()
+        record = self.records.get(key)
+        if record:
+            return record
+        for provider in PROVIDERS:
+            record = self.by_provider.get((provider, key))
+            if record:
+                return record
+        symbol_matches = self.by_symbol.get(key)
+        if symbol_matches:
+            return symbol_matches[0]
+        return self.by_name.get(key)
+
+    def provider_id(self, query: str, provider: str) -> str:
+        """The id `provider` expects for a coin, falling back to the query as given"""
+        record = self.resolve(query)
+        if record is None:
+            return query.upper() if provider == "cryptocompare" else query
+        return record.provider_ids[provider]
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Exact id/symbol matches, then prefix matches, then fuzzy trigram matches, each by rank"""
+        q = (query or "").strip().lower()
+        if not q:
+            return []
+        scores = {}  # id -> (match class, rank)
+
+        def add(record, match_class):
+            current = scores.get(record.id)
+            if current is None or match_class < current[0]:
+                scores[record.id] = (match_class, _rank_key(record))
+
+        if q in self.records:
+            add(self.records[q], 0)
+        for record in self.by_symbol.get(q, ()):
+            add(record, 0)
+
+        start = bisect_left(self.prefixes, (q, ""))
+        for term, coin_id in self.prefixes[start:]:
+            if not term.startswith(q):
+                break
+            add(self.records[coin_id], 1)
+
+        if len(q) >= 3:
+            query_grams = trigrams(q)
+            counts = {}
+            for gram in query_grams:
+                for coin_id in self.grams.get(gram, ()):
+                    counts[coin_id] = counts.get(coin_id, 0) + 1
+            for coin_id, count in counts.items():
+                if count / len(query_grams) >= MIN_TRIGRAM_SCORE:
+                    add(self.records[coin_id], 2)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1])
+        return [self.records[coin_id] for coin_id, _ in ranked[:limit]]
+
+    def stats(self) -> dict:
+        return {"coins": len(self.records), "symbols": len(self.by_symbol), "trigrams": len(self.grams)}
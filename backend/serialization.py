@@ -0,0 +1,144 @@
+"""Wire formats for API responses and WebSocket messages
+
+JSON goes through orjson when it is installed. Clients can negotiate
+MessagePack instead (Accept: application/msgpack on HTTP, ?format=msgpack on
+WebSockets); in MessagePack, long float arrays such as sparklines travel as
+packed little-endian float32 under extension type FLOAT32_EXT. A Payload
+serializes its data at most once per format, however many clients receive it.
+"""
+
+import hashlib
+import json
+import sys
+from array import array
+
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "json"  # UTF-8 bytes, for HTTP bodies
+TEXT = "text"  # str, for WebSocket text frames
+MSGPACK = "msgpack"
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+FLOAT32_EXT = 1
+PACKED_ARRAY_MIN = 16  # shorter float lists are left as plain msgpack arrays
+
+if orjson:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps_bytes(data) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson:
+        return orjson.dumps(data, option=_ORJSON_OPTIONS)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _float32(values):
+    packed = array("f", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return msgpack.ExtType(FLOAT32_EXT, packed.tobytes())
+
+
+def _pack_arrays(data):
+    if isinstance(data, dict):
+        return {key: _pack_arrays(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        # Floats only: ints (timestamps, counts) above 2**24 don't survive float32
+        if len(data) >= PACKED_ARRAY_MIN and all(type(value) is float for value in data):
+            return _float32(data)
+        return [_pack_arrays(value) for value in data]
+    return data
+
+
+def packb(data) -> bytes:
+    """MessagePack with long float arrays packed as float32"""
+    return msgpack.packb(_pack_arrays(data), use_bin_type=True)
+
+
+def negotiate(accept: str) -> str:
+    """Response format for an Accept header: MessagePack when asked for and available, else JSON"""
+    if msgpack and accept and any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        return MSGPACK
+    return JSON
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak If-None-Match comparison against a strong ETag"""
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def websocket_format(requested: str) -> str:
+    """Wire format for a WebSocket client's ?format= query parameter"""
+    return MSGPACK if msgpack and requested == MSGPACK else TEXT
+
+
+class Payload:
+    """A message serialized lazily and at most once per wire format"""
+
+    __slots__ = ("data", "_encoded")
+
+    def __init__(self, data):
+        self.data = data
+        self._encoded = {}
+
+    def encode(self, fmt: str = JSON):
+        encoded = self._encoded.get(fmt)
+        if encoded is None:
+            if fmt == MSGPACK:
+                encoded = packb(self.data)
+            elif fmt == TEXT:
+                encoded = self.encode(JSON).decode()
+            else:
+                encoded = dumps_bytes(self.data)
+            self._encoded[fmt] = encoded
+        return encoded
+
+    def etag(self, fmt: str = JSON) -> str:
+        """Strong ETag of the encoded body, computed once per format"""
+        key = ("etag", fmt)
+        etag = self._encoded.get(key)
+        if etag is None:
+            etag = '"' + hashlib.blake2b(self.encode(fmt), digest_size=10).hexdigest() + '"'
+            self._encoded[key] = etag
+        return etag
+
+    def response(self, accept: str = "", status_code: int = 200, headers=None, if_none_match: str = None) -> Response:
+        """Response in the negotiated format; with `if_none_match` (the request header, possibly
+        empty) it carries an ETag and becomes a 304 when the client's copy is current"""
+        fmt = negotiate(accept)
+        media_type = MSGPACK_MEDIA_TYPES[0] if fmt == MSGPACK else "application/json"
+        headers = dict(headers or {})
+        headers["Vary"] = "Accept"
+        if if_none_match is not None:
+            headers["ETag"] = self.etag(fmt)
+            if etag_matches(if_none_match, headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+        return Response(content=self.encode(fmt), status_code=status_code, media_type=media_type, headers=headers)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: JSONResponse rendered with orjson when available"""
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
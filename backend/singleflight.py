@@ -0,0 +1,49 @@
+import asyncio
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight awaitable
+
+    Callers asking for a key that is already being fetched await the same task
+    and receive the same result (or exception). The key is forgotten as soon as
+    the call completes, so this coalesces bursts without caching anything. If
+    every caller is cancelled, the underlying call is cancelled too.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, fn):
+        call = self._calls.get(key)
+        if call is None:
+            self.calls += 1
+            task = asyncio.create_task(fn())
+            call = [task, 0]  # task, number of waiting callers
+            task.add_done_callback(lambda t, key=key, call=call: self._done(key, call))
+            self._calls[key] = call
+        else:
+            self.shared += 1
+
+        task = call[0]
+        call[1] += 1
+        try:
+            # Shield so one cancelled caller doesn't cancel the fetch for the others
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if call[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            call[1] -= 1
+
+    def _done(self, key, call: list):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        task = call[0]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "calls": self.calls, "shared": self.shared}
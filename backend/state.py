@@ -0,0 +1,485 @@
+"""Shared state backends for running several workers or replicas
+
+A backend provides a small key/value cache with expiry, leases for leader
+election and fill locks, and pub/sub. LocalState keeps everything in process
+memory and is the default for a single worker. FileState shares a directory
+between workers on one host, electing leaders with flock(). RedisState speaks
+the Redis protocol (RESP) directly over asyncio streams, so it works against
+Redis or any compatible server without a client library, across hosts. In every
+case one elected worker polls upstream, writes results to the shared cache and
+publishes them; every worker, the leader included, relays published updates to
+its own sockets.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from urllib.parse import quote, unquote, urlsplit
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from backend.serialization import dumps_bytes, loads
+
+KEY_PREFIX = "krypticks:"
+FILL_WAIT = 5.0  # seconds a worker waits for another worker's in-flight fill
+FILL_POLL = 0.25
+RECONNECT_DELAY = 1.0
+FILE_POLL_INTERVAL = 0.5  # seconds between FileState checks for published messages
+
+# Lease renewal and release only act if the caller still holds the lease
+RENEW_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class StateBackend:
+    """Common behaviour on top of the get/set/lease/publish primitives"""
+
+    name = "base"
+    shared = True  # whether other workers can read this backend's cache
+
+    def __init__(self):
+        self.owner = worker_id()
+        self.handlers = {}  # channel -> [async handler(bytes)]
+        self.leading = set()
+        self.fills = {"loaded": 0, "shared": 0, "waited": 0}
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        for name in list(self.leading):
+            try:
+                await self.release(name)
+            except Exception:
+                pass
+
+    async def subscribe(self, channel: str, handler):
+        self.handlers.setdefault(channel, []).append(handler)
+
+    async def _dispatch(self, channel: str, message: bytes):
+        for handler in self.handlers.get(channel, ()):
+            try:
+                await handler(message)
+            except Exception as e:
+                print(f"Error handling {channel} update: {e}")
+
+    async def lead(self, name: str, ttl: float) -> bool:
+        """Acquire or renew the named lease for this worker; True while this worker holds it"""
+        held = await self.acquire(name, ttl)
+        if held:
+            if name not in self.leading:
+                print(f"Worker {self.owner} is now leader for {name}")
+            self.leading.add(name)
+        else:
+            self.leading.discard(name)
+        return held
+
+    async def read_through(self, key: str, loader, ttl: float):
+        """Shared-cache read; on a miss one worker runs `loader` while the others wait for its result"""
+        data = await self.get(key)
+        if data is not None:
+            self.fills["shared"] += 1
+            return loads(data)
+        lock = f"fill:{key}"
+        if await self.acquire(lock, FILL_WAIT):
+            try:
+                value = await loader()
+                await self.set(key, dumps_bytes(value), ttl)
+                self.fills["loaded"] += 1
+                return value
+            finally:
+                await self.release(lock)
+
+        deadline = time.monotonic() + FILL_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(FILL_POLL)
+            data = await self.get(key)
+            if data is not None:
+                self.fills["waited"] += 1
+                return loads(data)
+        # The filling worker died or stalled; load it ourselves
+        return await loader()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "worker": self.owner,
+            "leading": sorted(self.leading),
+            "fills": self.fills,
+        }
+
+
+class LocalState(StateBackend):
+    """In-process backend; every call succeeds immediately and publish() delivers inline"""
+
+    name = "local"
+    shared = False
+
+    def __init__(self):
+        super().__init__()
+        self.values = {}  # key -> (bytes, expires_at or None)
+        self.leases = {}  # name -> (owner, expires_at)
+
+    async def get(self, key: str):
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.values[key]
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        self.values[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    async def acquire(self, name: str, ttl: float) -> bool:
+        now = time.monotonic()
+        lease = self.leases.get(name)
+        if lease and lease[0] != self.owner and lease[1] > now:
+            return False
+        self.leases[name] = (self.owner, now + ttl)
+        return True
+
+    async def release(self, name: str):
+        lease = self.leases.get(name)
+        if lease and lease[0] == self.owner:
+            del self.leases[name]
+
+    async def publish(self, channel: str, message: bytes):
+        await self._dispatch(channel, message)
+
+
+class FileState(StateBackend):
+    """Backend for several workers on one host sharing `directory`
+
+    Leases are flock() locks held for as long as this worker keeps leading, so
+    a crashed leader releases them immediately. Cache entries and the latest
+    message per channel are files replaced atomically; workers poll channel
+    files for changes.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: str):
+        super().__init__()
+        if fcntl is None:
+            raise RuntimeError("FileState needs fcntl (POSIX)")
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "cache"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "channels"), exist_ok=True)
+        self.locks = {}  # name -> open file holding the flock
+        self.seen = {}  # channel -> mtime_ns of the last message dispatched
+        self.watcher = None
+
+    def _path(self, kind: str, name: str) -> str:
+        return os.path.join(self.directory, kind, quote(name, safe=""))
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+
+    @staticmethod
+    def _read(path: str):
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def close(self):
+        await super().close()
+        if self.watcher:
+            self.watcher.cancel()
+            try:
+                await self.watcher
+            except asyncio.CancelledError:
+                pass
+        for name in list(self.locks):
+            await self.release(name)
+
+    async def get(self, key: str):
+        data = await asyncio.to_thread(self._read, self._path("cache", key))
+        if data is None:
+            return None
+        header, _, value = data.partition(b"\n")
+        expires_at = float(header)
+        if expires_at and expires_at <= time.time():
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        header = b"%f\n" % (time.time() + ttl if ttl else 0)
+        await asyncio.to_thread(self._write, self._path("cache", key), header + value)
+
+    async def acquire(self, name: str, ttl: float) -> bool:
+        # The lock lives as long as the file stays open, so ttl is not needed
+        if name in self.locks:
+            return True
+        f = open(self._path("channels", name + ".lock"), "a+b")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self.locks[name] = f
+        return True
+
+    async def release(self, name: str):
+        f = self.locks.pop(name, None)
+        if f:
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    async def publish(self, channel: str, message: bytes):
+        await asyncio.to_thread(self._write, self._path("channels", channel), message)
+
+    async def subscribe(self, channel: str, handler):
+        await super().subscribe(channel, handler)
+        try:
+            self.seen[channel] = os.stat(self._path("channels", channel)).st_mtime_ns
+        except FileNotFoundError:
+            self.seen[channel] = 0
+        if self.watcher is None:
+            self.watcher = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(FILE_POLL_INTERVAL)
+            for channel in list(self.handlers):
+                path = self._path("channels", channel)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if mtime == self.seen.get(channel):
+                    continue
+                self.seen[channel] = mtime
+                message = await asyncio.to_thread(self._read, path)
+                if message is not None:
+                    await self._dispatch(channel, message)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["directory"] = self.directory
+        return stats
+
+
+class RespError(Exception):
+    """Error reply from the server"""
+
+
+class RespConnection:
+    """One RESP connection; commands are serialized so replies pair with requests"""
+
+    def __init__(self, host: str, port: int, password: str = None, db: int = 0, ssl: bool = False,
+                 username: str = None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.username = username
+        self.db = db
+        self.ssl = ssl
+        self.reader = None
+        self.writer = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        if self.password:
+            if self.username:
+                await self._command("AUTH", self.username, self.password)
+            else:
+                await self._command("AUTH", self.password)
+        if self.db:
+            await self._command("SELECT", self.db)
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = None
+
+    @staticmethod
+    def encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RespError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self.reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self.read_reply() for _ in range(count)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    def abort(self):
+        """Drop the connection without waiting, e.g. while a cancellation is unwinding"""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    async def _command(self, *args):
+        try:
+            self.writer.write(self.encode(args))
+            await self.writer.drain()
+            return await self.read_reply()
+        except RespError:
+            # An error reply is read in full; the connection is still in step
+            raise
+        except BaseException:
+            # Interrupted (cancelled, timed out, disconnected) between the write and
+            # the end of the reply: the next command would read this one's reply
+            self.abort()
+            raise
+
+    async def execute(self, *args):
+        """Send one command and return its reply, reconnecting once if the connection dropped"""
+        async with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self.writer is None:
+                        await self.connect()
+                    return await self._command(*args)
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    await self.close()
+                    if attempt:
+                        raise
+
+
+class RedisState(StateBackend):
+    """Backend on a Redis-protocol server given as redis://[user:password@]host[:port][/db]"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        super().__init__()
+        parts = urlsplit(url)
+        self.options = {
+            "host": parts.hostname or "localhost",
+            "port": parts.port or 6379,
+            "password": unquote(parts.password) if parts.password else None,
+            "username": unquote(parts.username) if parts.username else None,
+            "db": int(parts.path.strip("/") or 0),
+            "ssl": parts.scheme == "rediss",
+        }
+        self.conn = RespConnection(**self.options)
+        self.listener = None
+        self.errors = 0
+
+    async def start(self):
+        await self.conn.connect()
+
+    async def close(self):
+        await super().close()
+        if self.listener:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+        await self.conn.close()
+
+    async def get(self, key: str):
+        return await self.conn.execute("GET", KEY_PREFIX + key)
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        if ttl:
+            await self.conn.execute("SET", KEY_PREFIX + key, value, "PX", int(ttl * 1000))
+        else:
+            await self.conn.execute("SET", KEY_PREFIX + key, value)
+
+    async def acquire(self, name: str, ttl: float) -> bool:
+        key = KEY_PREFIX + "lease:" + name
+        ms = int(ttl * 1000)
+        if await self.conn.execute("SET", key, self.owner, "NX", "PX", ms) == "OK":
+            return True
+        return await self.conn.execute("EVAL", RENEW_SCRIPT, 1, key, self.owner, ms) == 1
+
+    async def release(self, name: str):
+        await self.conn.execute("EVAL", RELEASE_SCRIPT, 1, KEY_PREFIX + "lease:" + name, self.owner)
+
+    async def publish(self, channel: str, message: bytes):
+        try:
+            await self.conn.execute("PUBLISH", KEY_PREFIX + channel, message)
+        except Exception as e:
+            # Keep this worker's own clients fed even if the backplane is down
+            self.errors += 1
+            print(f"Publish to {channel} failed, delivering locally: {e}")
+            await self._dispatch(channel, message)
+
+    async def subscribe(self, channel: str, handler):
+        await super().subscribe(channel, handler)
+        if self.listener:
+            # Resubscribe with the new channel set
+            self.listener.cancel()
+        self.listener = asyncio.create_task(self._listen(list(self.handlers)))
+
+    async def _listen(self, channels):
+        """Dedicated subscriber connection, reconnected with a delay whenever it drops"""
+        while True:
+            conn = RespConnection(**self.options)
+            try:
+                await conn.connect()
+                conn.writer.write(conn.encode(["SUBSCRIBE", *(KEY_PREFIX + channel for channel in channels)]))
+                await conn.writer.drain()
+                while True:
+                    reply = await conn.read_reply()
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        await self._dispatch(reply[1].decode()[len(KEY_PREFIX):], reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"Pub/sub connection lost: {e}")
+            finally:
+                await conn.close()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["server"] = f"{self.options['host']}:{self.options['port']}"
+        stats["errors"] = self.errors
+        return stats
+
+
+def create_state(url: str = None, directory: str = None) -> StateBackend:
+    """RedisState for a redis:// or rediss:// URL, FileState for a shared directory, otherwise LocalState"""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisState(url)
+    if directory:
+        return FileState(directory)
+    return LocalState()
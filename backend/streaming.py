@@ -0,0 +1,294 @@
+"""Incremental technical indicators, updated in O(1) per price
+
+Each indicator supports push(price), which commits a new sample, and peek(price),
+which returns what the value would be if `price` were the next sample without
+changing any state. IndicatorBook keeps one IndicatorState per coin, commits a
+sample once per sparkline interval and peeks the live price on every tick, so
+WebSocket refreshes get current indicator values without recomputing history.
+"""
+
+import math
+import time
+from collections import deque
+
+from backend.indicators import BB_PERIOD, BB_STD_DEV, MACD_FAST, MACD_SLOW, RSI_PERIOD, STOCH_PERIOD
+
+MACD_SIGNAL = 9
+SPARKLINE_WINDOW = 168  # hourly points in a 7d sparkline, used for the 7d high/low
+SAMPLE_INTERVAL = 3600  # seconds between committed samples, matching sparkline spacing
+
+
+class EMA:
+    """Exponential moving average seeded with the simple average of the first `period` samples"""
+
+    __slots__ = ("period", "alpha", "value", "_seed_sum", "_count")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value = None
+        self._seed_sum = 0.0
+        self._count = 0
+
+    def push(self, price: float):
+        if self.value is None:
+            self._seed_sum += price
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed_sum / self.period
+        else:
+            self.value += self.alpha * (price - self.value)
+        return self.value
+
+    def peek(self, price: float):
+        if self.value is None:
+            if self._count + 1 == self.period:
+                return (self._seed_sum + price) / self.period
+            return None
+        return self.value + self.alpha * (price - self.value)
+
+
+class WilderRSI:
+    """RSI with Wilder smoothing of average gains and losses"""
+
+    __slots__ = ("period", "last", "avg_gain", "avg_loss", "_gain_sum", "_loss_sum", "_changes")
+
+    def __init__(self, period: int = RSI_PERIOD):
+        self.period = period
+        self.last = None
+        self.avg_gain = None
+        self.avg_loss = None
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._changes = 0
+
+    def _averages(self, price: float):
+        change = price - self.last
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self.avg_gain is not None:
+            p = self.period
+            return (self.avg_gain * (p - 1) + gain) / p, (self.avg_loss * (p - 1) + loss) / p
+        if self._changes + 1 == self.period:
+            return (self._gain_sum + gain) / self.period, (self._loss_sum + loss) / self.period
+        return None
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def push(self, price: float):
+        if self.last is not None:
+            averages = self._averages(price)
+            if averages is None:
+                change = price - self.last
+                self._gain_sum += change if change > 0 else 0.0
+                self._loss_sum += -change if change < 0 else 0.0
+                self._changes += 1
+            else:
+                self.avg_gain, self.avg_loss = averages
+        self.last = price
+        return self.value
+
+    def peek(self, price: float):
+        if self.last is None:
+            return None
+        averages = self._averages(price)
+        return self._rsi(*averages) if averages else None
+
+    @property
+    def value(self):
+        return self._rsi(self.avg_gain, self.avg_loss) if self.avg_gain is not None else None
+
+
+class MACD:
+    """MACD line (fast EMA - slow EMA), its signal EMA and histogram"""
+
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def push(self, price: float):
+        fast = self.fast.push(price)
+        slow = self.slow.push(price)
+        if fast is not None and slow is not None:
+            self.signal.push(fast - slow)
+
+    def peek(self, price: float):
+        fast = self.fast.peek(price)
+        slow = self.slow.peek(price)
+        if fast is None or slow is None:
+            return None, None
+        line = fast - slow
+        return line, self.signal.peek(line)
+
+
+class RollingBollinger:
+    """Bollinger bands over a sliding window using a rolling mean and sum of squared deviations"""
+
+    __slots__ = ("period", "std_dev", "window", "mean", "m2")
+
+    def __init__(self, period: int = BB_PERIOD, std_dev: float = BB_STD_DEV):
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _next(self, price: float):
+        n = len(self.window)
+        if n < self.period:
+            # Welford's update while the window fills
+            mean = self.mean + (price - self.mean) / (n + 1)
+            return mean, self.m2 + (price - self.mean) * (price - mean)
+        oldest = self.window[0]
+        mean = self.mean + (price - oldest) / n
+        return mean, self.m2 + (price - oldest) * (price - mean + oldest - self.mean)
+
+    def _bands(self, mean: float, m2: float):
+        std = (max(m2, 0.0) / self.period) ** 0.5
+        return mean + self.std_dev * std, mean, mean - self.std_dev * std
+
+    def push(self, price: float):
+        self.mean, self.m2 = self._next(price)
+        self.window.append(price)
+        if len(self.window) > self.period:
+            self.window.popleft()
+
+    def peek(self, price: float):
+        if len(self.window) + 1 < self.period:
+            return None, None, None
+        return self._bands(*self._next(price))
+
+
+class RollingRange:
+    """Sliding-window min and max with monotonic deques"""
+
+    __slots__ = ("period", "count", "mins", "maxs")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.mins = deque()  # (index, price), prices increasing
+        self.maxs = deque()  # (index, price), prices decreasing
+
+    def push(self, price: float):
+        index = self.count
+        self.count += 1
+        while self.mins and self.mins[-1][1] >= price:
+            self.mins.pop()
+        self.mins.append((index, price))
+        while self.maxs and self.maxs[-1][1] <= price:
+            self.maxs.pop()
+        self.maxs.append((index, price))
+        oldest = self.count - self.period
+        if self.mins[0][0] < oldest:
+            self.mins.popleft()
+        if self.maxs[0][0] < oldest:
+            self.maxs.popleft()
+
+    def _survivor(self, extremes: deque):
+        # Extreme of the current window minus the sample a push would evict
+        evicted = self.count - self.period
+        if extremes[0][0] != evicted:
+            return extremes[0][1]
+        return extremes[1][1] if len(extremes) > 1 else None
+
+    def peek(self, price: float):
+        """(low, high) of the window if `price` were pushed"""
+        if not self.count:
+            return price, price
+        low = self._survivor(self.mins)
+        high = self._survivor(self.maxs)
+        return (price if low is None else min(low, price),
+                price if high is None else max(high, price))
+
+
+class IndicatorState:
+    """All streaming indicators for one coin"""
+
+    __slots__ = ("rsi", "macd", "bollinger", "stochastic", "range_7d", "samples", "sampled_at")
+
+    def __init__(self):
+        self.rsi = WilderRSI(RSI_PERIOD)
+        self.macd = MACD()
+        self.bollinger = RollingBollinger(BB_PERIOD, BB_STD_DEV)
+        self.stochastic = RollingRange(STOCH_PERIOD)
+        self.range_7d = RollingRange(SPARKLINE_WINDOW)
+        self.samples = 0
+        self.sampled_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.samples >= MACD_SLOW
+
+    def push(self, price: float):
+        self.rsi.push(price)
+        self.macd.push(price)
+        self.bollinger.push(price)
+        self.stochastic.push(price)
+        self.range_7d.push(price)
+        self.samples += 1
+
+    def peek(self, price: float) -> dict:
+        """Indicator values with `price` as the live sample, in compute_indicators' shape"""
+        macd, macd_signal = self.macd.peek(price)
+        upper, middle, lower = self.bollinger.peek(price)
+        low, high = self.stochastic.peek(price)
+        stoch = 50 if high == low or self.stochastic.count + 1 < STOCH_PERIOD else (price - low) / (high - low) * 100
+        low_7d, high_7d = self.range_7d.peek(price)
+        return {
+            "rsi": self.rsi.peek(price),
+            "stochastic": stoch,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_histogram": macd - macd_signal if macd is not None and macd_signal is not None else None,
+            "bollinger_upper": upper,
+            "bollinger_middle": middle,
+            "bollinger_lower": lower,
+            "high": high_7d,
+            "low": low_7d,
+        }
+
+
+class IndicatorBook:
+    """Streaming indicator state per coin id, fed by the market refresh loop"""
+
+    def __init__(self, sample_interval: float = SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+        self.states = {}
+        self.latest = {}
+
+    def update(self, markets, now: float = None):
+        """Ingest one market refresh (a MarketSnapshot); O(1) per coin once a coin has been seen"""
+        now = time.time() if now is None else now
+        prices = markets.values("current_price")
+        for index, coin_id in enumerate(markets.values("id")):
+            price = prices[index]
+            if not coin_id or not price:
+                continue
+            state = self.states.get(coin_id)
+            if state is None:
+                # First sighting: replay the sparkline once so the state starts warm
+                state = IndicatorState()
+                for historic in markets.sparkline(index):
+                    if not math.isnan(historic):
+                        state.push(historic)
+                state.sampled_at = now
+                self.states[coin_id] = state
+            elif now - state.sampled_at >= self.sample_interval:
+                state.push(price)
+                state.sampled_at = now
+            self.latest[coin_id] = state.peek(price)
+
+    def get(self, coin_id: str):
+        """Latest indicator values for a coin, or None until its state has enough history"""
+        state = self.states.get(coin_id)
+        if state is None or not state.ready:
+            return None
+        return self.latest.get(coin_id)
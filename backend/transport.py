@@ -0,0 +1,79 @@
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class UpstreamClients:
+    """One pooled httpx client per upstream provider
+
+    Each provider gets its own connection pool so a slow provider can't starve
+    the others of connections. Clients are created on start() (app lifespan) and
+    closed on close(); client() also creates them lazily for scripts and tests.
+    """
+
+    def __init__(self, config: dict, timeout: httpx.Timeout):
+        self.config = config
+        self.timeout = timeout
+        self.clients = {}
+        self.in_flight = {name: 0 for name in config}
+        self.requests = {name: 0 for name in config}
+
+    def _create(self, provider: str) -> httpx.AsyncClient:
+        options = self.config[provider]
+        limits = httpx.Limits(
+            max_connections=options["max_connections"],
+            max_keepalive_connections=options["max_keepalive_connections"],
+            keepalive_expiry=options["keepalive_expiry"],
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=self.timeout,
+            http2=options.get("http2", False) and HTTP2_AVAILABLE,
+        )
+
+    async def start(self):
+        for provider in self.config:
+            self.client(provider)
+
+    async def close(self):
+        clients, self.clients = self.clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        client = self.clients.get(provider)
+        if client is None:
+            client = self._create(provider)
+            self.clients[provider] = client
+        return client
+
+    async def get(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        client = self.client(provider)
+        self.in_flight[provider] += 1
+        self.requests[provider] += 1
+        try:
+            return await client.get(url, **kwargs)
+        finally:
+            self.in_flight[provider] -= 1
+
+    def stats(self) -> dict:
+        result = {}
+        for provider, options in self.config.items():
+            client = self.clients.get(provider)
+            # httpx doesn't expose its pool publicly; read it defensively
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = getattr(pool, "connections", None)
+            max_connections = options["max_connections"]
+            result[provider] = {
+                "http2": bool(options.get("http2", False) and HTTP2_AVAILABLE),
+                "max_connections": max_connections,
+                "open_connections": len(connections) if connections is not None else None,
+                "in_flight": self.in_flight[provider],
+                "utilization": round(self.in_flight[provider] / max_connections, 3),
+                "requests": self.requests[provider],
+            }
+        return result
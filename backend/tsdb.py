@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sqlite3
+import threading
+
+CANDLE_FIELDS = ("time", "open", "high", "low", "close", "volumefrom", "volumeto")
+
+
+class CandleStore:
+    """On-disk OHLCV candle store backed by SQLite
+
+    Candles are keyed by (symbol, timeframe, time) so re-fetching an hour that
+    is still forming simply overwrites it. All methods have async wrappers that
+    run the blocking SQLite call in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                time INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL,
+                volumefrom REAL, volumeto REAL,
+                PRIMARY KEY (symbol, timeframe, time)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def bounds_sync(self, symbol: str, timeframe: str = "1h"):
+        """(earliest, latest) candle time stored for a symbol, or (None, None)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(time), MAX(time) FROM candles WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe),
+            ).fetchone()
+
+    def insert_sync(self, symbol: str, candles, timeframe: str = "1h") -> int:
+        rows = [
+            (symbol, timeframe, int(c["time"]), c.get("open"), c.get("high"), c.get("low"),
+             c.get("close"), c.get("volumefrom"), c.get("volumeto"))
+            for c in candles
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def range_sync(self, symbol: str, start: int = None, end: int = None, limit: int = None,
+                   timeframe: str = "1h") -> list:
+        """Candles in [start, end], oldest first; with `limit`, the most recent `limit` of them"""
+        query = "SELECT time, open, high, low, close, volumefrom, volumeto FROM candles WHERE symbol = ? AND timeframe = ?"
+        params = [symbol, timeframe]
+        if start is not None:
+            query += " AND time >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND time <= ?"
+            params.append(end)
+        query += " ORDER BY time DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        rows.reverse()
+        return [dict(zip(CANDLE_FIELDS, row)) for row in rows]
+
+    async def bounds(self, symbol: str, timeframe: str = "1h"):
+        return await asyncio.to_thread(self.bounds_sync, symbol, timeframe)
+
+    async def insert(self, symbol: str, candles, timeframe: str = "1h") -> int:
+        return await asyncio.to_thread(self.insert_sync, symbol, candles, timeframe)
+
+    async def range(self, symbol: str, start: int = None, end: int = None, limit: int = None,
+                    timeframe: str = "1h") -> list:
+        return await asyncio.to_thread(self.range_sync, symbol, start, end, limit, timeframe)
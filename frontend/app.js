@@ -366,6 +366,26 @@ function formatPercent(num) {
 }
 
 // WebSocket
+// /ws/prices sends a price_update snapshot with a sequence number, then
+// price_delta messages carrying only the fields that changed
+let streamPrices = [];
+let priceSeq = null;
+
+function applyPriceDelta(coins, delta) {
+    const byId = new Map(coins.map(coin => [coin.id, coin]));
+    Object.entries(delta.changes || {}).forEach(([id, fields]) => {
+        byId.set(id, Object.assign({}, byId.get(id), fields));
+    });
+    (delta.removed || []).forEach(id => byId.delete(id));
+    const order = delta.order || coins.map(coin => coin.id);
+    return order.map(id => byId.get(id)).filter(Boolean);
+}
+
+// Jittered so clients dropped together by a deploy (close code 1012) don't all reconnect at once
+function reconnectDelay(base) {
+    return base / 2 + Math.random() * base;
+}
+
 function initializeWebSocket() {
     let reconnectInterval = 5000;
     
@@ -376,13 +396,27 @@ function initializeWebSocket() {
             ws.onopen = () => {
                 console.log('✓ WebSocket connected');
                 reconnectInterval = 5000;
+                priceSeq = null;
             };
             
             ws.onmessage = (e) => {
                 try {
                     const data = JSON.parse(e.data);
                     if (data.type === 'price_update' && data.data) {
-                        marketsData = data.data;
+                        streamPrices = data.data;
+                        priceSeq = data.seq ?? null;
+                        marketsData = streamPrices;
+                        renderAllUI();
+                    } else if (data.type === 'price_delta') {
+                        if (priceSeq === null || data.base !== priceSeq) {
+                            // Missed an update: ask for a fresh snapshot
+                            priceSeq = null;
+                            ws.send(JSON.stringify({ type: 'resync' }));
+                            return;
+                        }
+                        streamPrices = applyPriceDelta(streamPrices, data);
+                        priceSeq = data.seq;
+                        marketsData = streamPrices;
                         renderAllUI();
                     }
                 } catch (err) {
@@ -393,7 +427,7 @@ function initializeWebSocket() {
             ws.onerror = (e) => console.error('✗ WebSocket error:', e);
             ws.onclose = () => {
                 console.log('⚠ WebSocket closed, reconnecting...');
-                setTimeout(connect, reconnectInterval);
+                setTimeout(connect, reconnectDelay(reconnectInterval));
                 reconnectInterval = Math.min(reconnectInterval * 1.5, 30000);
             };
         } catch (error) {
@@ -692,57 +726,12 @@ function loadVIPDashboard() {
     
     container.innerHTML = '<div style="padding: 40px; text-align: center; color: var(--text-muted);">Loading premium signals...</div>';
     
-    // Fetch VIP signals from API
+    // Fetch VIP signals from API, then follow live snapshot pushes
     fetch(`${API_BASE}/api/vip/signals`)
         .then(res => res.json())
         .then(data => {
-            if (!data.success || !data.signals) {
-                container.innerHTML = '<div style="padding: 20px; color: red;">Failed to load signals</div>';
-                return;
-            }
-            
-            console.log('✓ Loaded', data.signals.length, 'VIP signals');
-            
-            // Render premium signals
-            container.innerHTML = data.signals.slice(0, 8).map(signal => `
-                <div class="vip-signal-card">
-                    <div class="vip-signal-header">
-                        <div class="vip-signal-coin">
-                            <strong>${signal.symbol}</strong>
-                            <span class="signal-pair">${signal.pair}</span>
-                        </div>
-                        <span class="vip-signal-badge" style="background: ${
-                            signal.signal === 'STRONG BUY' ? '#10b981' : 
-                            signal.signal === 'BUY' ? '#3b82f6' :
-                            signal.signal === 'SELL' ? '#ef4444' :
-                            signal.signal === 'STRONG SELL' ? '#991b1b' :
-                            '#f59e0b'
-                        };">${signal.signal}</span>
-                    </div>
-                    
-                    <div class="vip-signal-price">
-                        <div>Price: <strong>$${signal.current_price.toFixed(2)}</strong></div>
-                        <div>24h Change: <span style="color: ${signal.price_24h_change >= 0 ? '#10b981' : '#ef4444'}">${signal.price_24h_change > 0 ? '+' : ''}${signal.price_24h_change.toFixed(2)}%</span></div>
-                    </div>
-                    
-                    <div class="vip-signal-analysis">
-                        <div>RSI: ${signal.rsi.toFixed(1)}</div>
-                        <div>Volume Trend: ${signal.volume_trend}</div>
-                        <div>Confidence: ${signal.confidence}%</div>
-                    </div>
-                    
-                    <div class="vip-signal-levels">
-                        <div>🎯 Target: $${signal.target_price.toFixed(2)}</div>
-                        <div>🛑 Stop Loss: $${signal.stop_loss.toFixed(2)}</div>
-                        <div>📊 Risk/Reward: ${signal.risk_reward_ratio.toFixed(2)}</div>
-                    </div>
-                    
-                    <div class="vip-signal-analysis-text">${signal.analysis}</div>
-                    <div style="margin-top: 10px; font-size: 12px; color: var(--text-muted);">
-                        Win Rate: ${signal.win_rate}% | Accuracy: ${signal.accuracy_score}%
-                    </div>
-                </div>
-            `).join('');
+            renderVIPSignals(data);
+            initializeSignalsWebSocket();
         })
         .catch(err => {
             console.error('Error loading VIP signals:', err);
@@ -750,6 +739,99 @@ function loadVIPDashboard() {
         });
 }
 
+function renderVIPSignals(data) {
+    const container = document.getElementById('premiumSignalsContainer');
+    if (!container) return;
+    
+    if (!data.success || !data.signals) {
+        container.innerHTML = '<div style="padding: 20px; color: red;">Failed to load signals</div>';
+        return;
+    }
+    
+    console.log('✓ Loaded', data.signals.length, 'VIP signals');
+    
+    // Render premium signals
+    container.innerHTML = data.signals.slice(0, 8).map(signal => `
+            <div class="vip-signal-card">
+                <div class="vip-signal-header">
+                    <div class="vip-signal-coin">
+                        <strong>${signal.symbol}</strong>
+                        <span class="signal-pair">${signal.pair}</span>
+                    </div>
+                    <span class="vip-signal-badge" style="background: ${
+                        signal.signal === 'STRONG BUY' ? '#10b981' : 
+                        signal.signal === 'BUY' ? '#3b82f6' :
+                        signal.signal === 'SELL' ? '#ef4444' :
+                        signal.signal === 'STRONG SELL' ? '#991b1b' :
+                        '#f59e0b'
+                    };">${signal.signal}</span>
+                </div>
+                
+                <div class="vip-signal-price">
+                    <div>Price: <strong>$${signal.current_price.toFixed(2)}</strong></div>
+                    <div>24h Change: <span style="color: ${signal.price_24h_change >= 0 ? '#10b981' : '#ef4444'}">${signal.price_24h_change > 0 ? '+' : ''}${signal.price_24h_change.toFixed(2)}%</span></div>
+                </div>
+                
+                <div class="vip-signal-analysis">
+                    <div>RSI: ${signal.rsi.toFixed(1)}</div>
+                    <div>Volume Trend: ${signal.volume_trend}</div>
+                    <div>Confidence: ${signal.confidence}%</div>
+                </div>
+                
+                <div class="vip-signal-levels">
+                    <div>🎯 Target: $${signal.target_price.toFixed(2)}</div>
+                    <div>🛑 Stop Loss: $${signal.stop_loss.toFixed(2)}</div>
+                    <div>📊 Risk/Reward: ${signal.risk_reward_ratio.toFixed(2)}</div>
+                </div>
+                
+                <div class="vip-signal-analysis-text">${signal.analysis}</div>
+                <div style="margin-top: 10px; font-size: 12px; color: var(--text-muted);">
+                    Win Rate: ${signal.win_rate}% | Accuracy: ${signal.accuracy_score}%
+                </div>
+            </div>
+        `).join('');
+}
+
+// VIP signal snapshots are pushed whenever the server recomputes a changed set
+let signalsSocket = null;
+
+function initializeSignalsWebSocket() {
+    if (signalsSocket) return;
+    let reconnectInterval = 5000;
+    
+    function connect() {
+        try {
+            signalsSocket = new WebSocket(`${WS_PROTOCOL}//${window.location.host}/ws/signals`);
+            
+            signalsSocket.onopen = () => {
+                console.log('✓ Signals WebSocket connected');
+                reconnectInterval = 5000;
+            };
+            
+            signalsSocket.onmessage = (e) => {
+                try {
+                    const data = JSON.parse(e.data);
+                    if (data.type === 'signals_update' && data.data) {
+                        renderVIPSignals(data.data);
+                    }
+                } catch (err) {
+                    console.error('✗ Signals WebSocket parse error:', err);
+                }
+            };
+            
+            signalsSocket.onclose = () => {
+                setTimeout(connect, reconnectDelay(reconnectInterval));
+                reconnectInterval = Math.min(reconnectInterval * 1.5, 30000);
+            };
+        } catch (error) {
+            console.error('✗ Signals WebSocket connection failed:', error);
+            setTimeout(connect, reconnectInterval);
+        }
+    }
+    
+    connect();
+}
+
 function handleCryptoPayment(event) {
     const btn = event.target.closest('.crypto-pay-btn');
     if (!btn) return;
@@ -1,11 +1,107 @@
+"""Launch the Krypticks API
+
+By default this is the production serve mode: WEB_CONCURRENCY workers (one per
+usable CPU unless set), uvloop and httptools when installed, a bounded graceful
+shutdown that closes WebSockets with 1012 so clients reconnect elsewhere, and
+explicit backlog/keep-alive settings. `python start.py --dev` runs a single
+auto-reloading worker instead.
+"""
+
+import importlib.util
+import math
 import os
-import subprocess
+import shutil
 import sys
+import tempfile
+
+import uvicorn
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+KEEP_ALIVE_TIMEOUT = int(os.getenv("KEEP_ALIVE_TIMEOUT", "15"))  # seconds an idle HTTP connection stays open
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "20"))  # seconds to drain requests on shutdown
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+CGROUP_ROOT = "/sys/fs/cgroup"  # where a container's CPU quota is visible
+
+
+def installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().split()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT):
+    """CPUs allowed by the container's CFS quota (cgroup v2 or v1), or None if unlimited"""
+    fields = _read(os.path.join(root, "cpu.max"))  # v2: "<quota> <period>" or "max <period>"
+    if fields is None:
+        quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))  # v1: -1 when unlimited
+        period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+        fields = quota + period if quota and period else None
+    if not fields or len(fields) < 2 or fields[0] in ("max", "-1"):
+        return None
+    try:
+        quota, period = int(fields[0]), int(fields[1])
+    except ValueError:
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+def available_cpus(root=CGROUP_ROOT):
+    """CPUs this process may actually use: its affinity mask, capped by any cgroup quota
+
+    os.cpu_count() reports the host's CPUs, so a container limited to one or two
+    CPUs on a large host would otherwise start one worker per host CPU.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    return min(cpus, limit) if limit else cpus
+
+
+def main():
+    dev = "--dev" in sys.argv[1:]
+    workers = 1 if dev else int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+
+    # Leader election: only one worker runs the market poller. Without Redis the
+    # workers on this host elect it with a file lock in a shared directory.
+    state_dir = None
+    if workers > 1 and not os.getenv("REDIS_URL") and not os.getenv("STATE_DIR"):
+        state_dir = tempfile.mkdtemp(prefix="krypticks-state-")
+        os.environ["STATE_DIR"] = state_dir
+
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+    print(f"Starting Krypticks API on {HOST}:{PORT} with {workers} worker(s), loop={loop}, http={http}")
+    uvicorn.run(
+        "backend.main:app",
+        host=HOST,
+        port=PORT,
+        workers=workers,
+        reload=dev,
+        loop=loop,
+        http=http,
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        ws_ping_interval=WS_PING_INTERVAL,
+        ws_ping_timeout=WS_PING_INTERVAL,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "*"),
+    )
+    if state_dir:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
 
-PORT = os.getenv("PORT", "8000")
-subprocess.run([
-    sys.executable, "-m", "uvicorn",
-    "backend.main:app",
-    "--host", "0.0.0.0",
-    "--port", PORT
-])
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Tiny in-process Redis-protocol server for tests
+
+Implements just what RedisState uses: PING, AUTH, SELECT, GET, SET with NX/PX,
+DEL, the two lease scripts via EVAL, PUBLISH and SUBSCRIBE. Expiry is checked
+lazily on access.
+"""
+
+import asyncio
+import time
+
+from backend.state import RELEASE_SCRIPT, RENEW_SCRIPT, RespConnection
+
+
+def encode_reply(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(encode_reply(item) for item in reply)
+
+
+class RespServer:
+    def __init__(self, delay: float = 0):
+        self.data = {}  # key -> (value, expires_at or None)
+        self.subscribers = {}  # channel -> set of writers
+        self.commands = []
+        self.delay = delay  # seconds before each reply, to test interrupted commands
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}"
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[0] if entry else None
+
+    async def _serve(self, reader, writer):
+        conn = RespConnection("127.0.0.1", 0)
+        conn.reader = reader
+        try:
+            while True:
+                args = await conn.read_reply()
+                self.commands.append(args)
+                command = args[0].upper()
+                if command == b"SUBSCRIBE":
+                    for count, channel in enumerate(args[1:], 1):
+                        self.subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(encode_reply([b"subscribe", channel, count]))
+                    await writer.drain()
+                    continue
+                reply = self._execute(command, args[1:])
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(encode_reply(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+    def _execute(self, command, args):
+        if command in (b"PING", b"AUTH", b"SELECT"):
+            return "PONG" if command == b"PING" else "OK"
+        if command == b"GET":
+            return self._get(args[0])
+        if command == b"SET":
+            key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+            expires = None
+            if b"PX" in options:
+                expires = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+            if b"NX" in options and self._get(key) is not None:
+                return None
+            self.data[key] = (value, expires)
+            return "OK"
+        if command == b"DEL":
+            return sum(1 for key in args if self.data.pop(key, None) is not None)
+        if command == b"EVAL":
+            script, key, owner = args[0].decode(), args[2], args[3]
+            if self._get(key) != owner:
+                return 0
+            if script == RENEW_SCRIPT:
+                self.data[key] = (owner, time.monotonic() + int(args[4]) / 1000)
+                return 1
+            if script == RELEASE_SCRIPT:
+                del self.data[key]
+                return 1
+            return Exception("unknown script")
+        if command == b"PUBLISH":
+            writers = self.subscribers.get(args[0], set())
+            for writer in writers:
+                writer.write(encode_reply([b"message", args[0], args[1]]))
+            return len(writers)
+        return Exception(f"unknown command {command.decode()}")
@@ -0,0 +1,73 @@
+import pytest
+
+from backend import aggregate
+from backend.aggregate import DAY, HOUR, WEEK, AggregateCache, lttb, resample
+
+
+def hourly_candles(count: int, start: int = 0) -> list:
+    return [{
+        "time": start + i * HOUR,
+        "open": 100.0 + i,
+        "high": 110.0 + i,
+        "low": 90.0 + i,
+        "close": 105.0 + (i % 7) * 3,
+        "volumefrom": 1.0,
+        "volumeto": 100.0,
+    } for i in range(count)]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend_mode(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(aggregate, "np", None)
+    elif aggregate.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+def test_resample_daily(backend_mode):
+    candles = hourly_candles(48)
+    bars = resample(candles, "1d")
+    assert [bar["time"] for bar in bars] == [0, DAY]
+    first = bars[0]
+    assert first["open"] == 100.0 and first["close"] == candles[23]["close"]
+    assert first["high"] == 133.0 and first["low"] == 90.0
+    assert first["volumefrom"] == 24.0 and first["volumeto"] == 2400.0
+
+
+def test_resample_weeks_start_on_monday(backend_mode):
+    bars = resample(hourly_candles(24, start=3 * DAY), "1w")  # Sunday 4 Jan 1970
+    assert [bar["time"] for bar in bars] == [4 * DAY - WEEK]
+    bars = resample(hourly_candles(48, start=3 * DAY), "1w")
+    assert [bar["time"] for bar in bars] == [4 * DAY - WEEK, 4 * DAY]
+
+
+def test_lttb_keeps_endpoints(backend_mode):
+    candles = hourly_candles(500)
+    sampled = lttb(candles, 50)
+    assert len(sampled) == 50
+    assert sampled[0] is candles[0] and sampled[-1] is candles[-1]
+    times = [c["time"] for c in sampled]
+    assert times == sorted(set(times))
+    assert lttb(candles, 1000) == candles
+
+
+def test_lttb_backends_agree():
+    if aggregate.np is None:
+        pytest.skip("numpy not installed")
+    candles = hourly_candles(1000)
+    fast = lttb(candles, 100)
+    assert [candles[i] for i in aggregate._lttb_python(candles, 100)] == fast
+
+
+def test_cache_expiry_and_lru():
+    cache = AggregateCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    expired = AggregateCache(ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 1}
@@ -0,0 +1,49 @@
+from backend.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyWindow, ProviderRouter
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, error_rate_threshold=1.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_half_open_single_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, open_seconds=0)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, open_seconds=0)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.times_opened == 2
+
+
+def test_router_prefers_healthy_providers():
+    breakers = {name: CircuitBreaker(name) for name in ("a", "b", "c")}
+    breakers["a"].record_success(0.1)
+    breakers["a"].record_failure()
+    breakers["b"].record_success(3.0)
+    breakers["c"].record_success(0.1)
+    assert ProviderRouter(breakers).order(["a", "b", "c"]) == ["c", "b", "a"]
+    breakers["c"].failure_threshold = 1
+    breakers["c"].record_failure()
+    assert ProviderRouter(breakers).order(["a", "b", "c"]) == ["b", "a"]
+
+
+def test_latency_window():
+    window = LatencyWindow(size=3)
+    assert window.percentile(95) is None
+    for seconds in (5.0, 1.0, 2.0, 3.0):
+        window.record(seconds)
+    assert window.percentile(0) == 1.0 and window.percentile(100) == 3.0
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from backend.cache import DetailCache, ResponseCache
+
+
+class Loader:
+    """Counts calls; returns the next value, or raises when told to fail"""
+
+    def __init__(self, value="fresh", delay: float = 0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return self.value
+
+
+def test_fresh_hit_skips_loader():
+    async def scenario():
+        cache = ResponseCache()
+        loader = Loader()
+        assert await cache.get("markets", loader, ttl=60) == "fresh"
+        assert await cache.get("markets", loader, ttl=60) == "fresh"
+        return cache, loader
+
+    cache, loader = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert cache.metrics["markets"]["hits"] == 1 and cache.metrics["markets"]["misses"] == 1
+
+
+def test_stale_served_during_single_background_refresh():
+    async def scenario():
+        cache = ResponseCache()
+        cache.set("markets", "old")
+        loader = Loader(delay=0.05)
+        results = await asyncio.gather(*(cache.get("markets", loader, ttl=0, stale_ttl=60) for _ in range(10)))
+        assert results == ["old"] * 10 and loader.calls == 1
+        await asyncio.sleep(0.1)
+        return cache, await cache.get("markets", loader, ttl=60)
+
+    cache, value = asyncio.run(scenario())
+    assert value == "fresh"
+    assert cache.metrics["markets"]["stale_hits"] == 10 and cache.metrics["markets"]["refreshes"] == 1
+
+
+def test_stale_served_when_refresh_fails():
+    async def scenario():
+        cache = ResponseCache()
+        cache.set("global", "old")
+        loader = Loader()
+        loader.fail = True
+        assert await cache.get("global", loader, ttl=0, stale_ttl=60) == "old"
+        await asyncio.sleep(0)
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.metrics["global"]["errors"] == 1 and cache.peek("global") == "old"
+
+
+def test_expired_entry_waits_for_loader():
+    async def scenario():
+        cache = ResponseCache()
+        cache.set("fear_greed", "old")
+        return await cache.get("fear_greed", Loader(), ttl=0, stale_ttl=0)
+
+    assert asyncio.run(scenario()) == "fresh"
+
+
+def test_error_raised_without_a_value_to_serve():
+    async def scenario():
+        cache = ResponseCache()
+        loader = Loader()
+        loader.fail = True
+        with pytest.raises(RuntimeError):
+            await cache.get("markets", loader, ttl=60, stale_ttl=60)
+        return cache
+
+    assert asyncio.run(scenario()).metrics["markets"]["errors"] == 1
+
+
+def fill(cache, keys, size: int = 30):
+    for key in keys:
+        cache.set(key, b"x" * size)
+
+
+def test_detail_cache_stays_under_byte_budget():
+    cache = DetailCache(100)
+    fill(cache, "abcdef")
+    assert cache.bytes <= 100 and list(cache.entries) == ["d", "e", "f"]
+    assert cache.metrics["evictions"] == 3
+    cache.set("huge", b"x" * 101)  # larger than the whole budget: not stored
+    assert "huge" not in cache.entries and cache.bytes == 90
+
+
+def test_detail_cache_evicts_least_requested_of_sample():
+    async def scenario():
+        cache = DetailCache(100, sample=3)
+        fill(cache, "abc")
+        for _ in range(5):
+            await cache.get("a", Loader(), ttl=60)  # hot, but least recently used once b and c are read
+        await cache.get("b", Loader(), ttl=60)
+        await cache.get("c", Loader(), ttl=60)
+        fill(cache, "d")
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert set(cache.entries) == {"a", "c", "d"}  # b: least requested among the 3 LRU candidates
+    assert cache.bytes <= 100
+
+
+def test_detail_cache_hot_and_decay():
+    async def scenario():
+        cache = DetailCache(1000)
+        for key, count in (("bitcoin", 6), ("ethereum", 3), ("dogecoin", 1)):
+            for _ in range(count):
+                await cache.get(key, Loader(b"{}"), ttl=60)
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.hot(2) == ["bitcoin", "ethereum"]
+    cache.decay()
+    assert cache.frequency == {"bitcoin": 3, "ethereum": 1.5, "dogecoin": 0.5}
+    cache.decay()
+    assert cache.frequency == {"bitcoin": 1.5, "ethereum": 0.75}
+    assert "dogecoin" in cache.entries  # decay forgets counts, not entries
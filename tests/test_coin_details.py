@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.cache import DetailCache
+from backend.registry import CoinRegistry
+from backend.serialization import JSON
+from backend.state import LocalState
+
+
+@pytest.fixture
+def details(monkeypatch):
+    cache = DetailCache(4096, sizeof=lambda payload: len(payload.encode(JSON)))
+    local = LocalState()
+    monkeypatch.setattr(main, "coin_details", cache)
+    monkeypatch.setattr(main, "state", local)
+
+    async def load_coin_details(coin_id):
+        return {"id": coin_id, "description": {"en": "x" * 500}}
+
+    monkeypatch.setattr(main, "load_coin_details", load_coin_details)
+    return cache, local
+
+
+def request(coin_id):
+    cache = main.coin_details
+    return cache.get(coin_id, main.coin_detail_loader(coin_id), *main.COIN_DETAIL_CACHE_TTL)
+
+
+def test_local_state_memory_stays_bounded(details):
+    cache, local = details
+
+    async def scenario():
+        for index in range(200):
+            payload = await request(f"random-{index}")
+            assert payload.data["id"] == f"random-{index}"
+
+    asyncio.run(scenario())
+    assert cache.bytes <= 4096 and len(cache.entries) < 200
+    assert local.values == {}
+    cache.decay()
+    cache.decay()
+    assert cache.frequency == {}  # one-off ids are forgotten by the refresh loop's decay
+
+
+def test_refresh_skips_local_state(details):
+    _, local = details
+    payload = asyncio.run(main.refresh_coin_details("bitcoin"))
+    assert payload.data["id"] == "bitcoin" and local.values == {}
+
+
+def not_found(url):
+    request = httpx.Request("GET", url)
+    return httpx.HTTPStatusError("404 Not Found", request=request, response=httpx.Response(404, request=request))
+
+
+def fake_upstream(responses):
+    async def upstream_get(provider, url, params=None, headers=None, priority=None, tail=False):
+        response = responses[provider]
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return upstream_get
+
+
+def test_unknown_coin_is_404_and_not_cached(monkeypatch):
+    monkeypatch.setattr(main, "coin_details", DetailCache(4096))
+    monkeypatch.setattr(main, "upstream_get", fake_upstream({
+        "coingecko": not_found("https://api.coingecko.com/api/v3/coins/zz11"),
+        "cryptocompare": {"Response": "Error", "Message": "There is no data for any of the toSymbols USD ."},
+        "coinstats": not_found("https://openapi.coinstats.app/public/v1/coins/zz11"),
+    }))
+    response = TestClient(main.app).get("/api/coin/zz11")
+    assert response.status_code == 404
+    assert main.coin_details.entries == {}
+
+
+def test_fallbacks_return_trimmed_details(monkeypatch):
+    registry = CoinRegistry()
+    registry.ingest([{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "market_cap_rank": 1}])
+    monkeypatch.setattr(main, "coin_registry", registry)
+    coin = {"id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "icon": "https://x/btc.png", "rank": 1,
+            "price": 50000.0, "marketCap": 1e12, "volume": 3e10, "priceChange1d": 1.5, "websiteUrl": "https://bitcoin.org",
+            "exp": ["https://blockchain.info"] * 50, "twitterUrl": "https://twitter.com/bitcoin"}
+    monkeypatch.setattr(main, "upstream_get", fake_upstream({
+        "coingecko": not_found("https://api.coingecko.com/api/v3/coins/bitcoin"),
+        "cryptocompare": {"Response": "Error", "Message": "rate limited"},
+        "coinstats": {"coin": coin},
+    }))
+    details = asyncio.run(main.load_coin_details("bitcoin"))
+    assert set(details) == set(main.trim_coin_details({}))
+    assert details["name"] == "Bitcoin" and details["market_data"]["current_price"] == {"usd": 50000.0}
+
+    monkeypatch.setattr(main, "upstream_get", fake_upstream({
+        "coingecko": not_found("https://api.coingecko.com/api/v3/coins/bitcoin"),
+        "cryptocompare": {"BTC": {"USD": 50100}},
+        "coinstats": not_found("https://openapi.coinstats.app/public/v1/coins/bitcoin"),
+    }))
+    details = asyncio.run(main.load_coin_details("bitcoin"))
+    assert set(details) == set(main.trim_coin_details({}))
+    assert details["market_data"]["current_price"] == {"usd": 50100.0}
@@ -0,0 +1,106 @@
+import asyncio
+
+from backend.connections import ClientConnection, ConnectionManager
+from backend.serialization import MSGPACK, Payload
+
+
+class FakeWebSocket:
+    """Records sent frames; a send blocks while `stalled` is set"""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+        self.stalled = False
+        self.failing = False
+
+    async def accept(self):
+        pass
+
+    async def _send(self, message):
+        if self.failing:
+            raise RuntimeError("connection reset")
+        while self.stalled:
+            await asyncio.sleep(0.01)
+        self.sent.append(message)
+
+    async def send_text(self, message: str):
+        await self._send(message)
+
+    async def send_bytes(self, message: bytes):
+        await self._send(message)
+
+    async def close(self, code: int = 1000):
+        self.closed = code
+
+
+def test_queue_drops_oldest_when_full():
+    async def scenario():
+        client = ClientConnection(FakeWebSocket(), queue_size=3)
+        dropped = [client.enqueue(n) for n in range(5)]
+        return client, dropped
+
+    client, dropped = asyncio.run(scenario())
+    assert dropped == [False, False, False, True, True]
+    assert client.dropped == 2 and [client.queue.get_nowait() for _ in range(3)] == [2, 3, 4]
+
+
+def test_publish_routes_by_topic():
+    async def scenario():
+        manager = ConnectionManager()
+        prices, signals, both = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(prices, ["prices"])
+        await manager.connect(signals, ["signals"])
+        await manager.connect(both, ["prices", "signals"], fmt=MSGPACK)
+        assert manager.publish("prices", Payload({"p": 1})) == 2
+        assert manager.publish("signals", "s") == 2
+        assert manager.publish("nobody", "x") == 0
+        manager.unsubscribe(both, "signals")
+        manager.publish("signals", "t")
+        await asyncio.sleep(0.01)
+        stats = manager.stats()
+        for websocket in (prices, signals, both):
+            manager.disconnect(websocket)
+        return prices, signals, both, stats, manager.stats()
+
+    prices, signals, both, stats, after = asyncio.run(scenario())
+    assert prices.sent == ['{"p":1}']
+    assert signals.sent == ["s", "t"]
+    assert isinstance(both.sent[0], bytes) and both.sent[1:] == ["s"]  # msgpack client, then a plain string
+    assert stats["topics"] == {"prices": 2, "signals": 1}
+    assert after == {"clients": 0, "topics": {}, "messages_dropped": 0, "clients_evicted": 0}
+
+
+def test_slow_consumer_is_evicted_without_blocking_others():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, send_timeout=0.05)
+        slow, fast = FakeWebSocket(), FakeWebSocket()
+        slow.stalled = True
+        await manager.connect(slow, ["prices"])
+        await manager.connect(fast, ["prices"])
+        for n in range(5):
+            manager.publish("prices", str(n))
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.15)
+        return manager, slow, fast
+
+    manager, slow, fast = asyncio.run(scenario())
+    assert fast.sent == ["0", "1", "2", "3", "4"]
+    assert slow.sent == [] and slow.closed == 1013
+    assert manager.messages_dropped > 0
+    assert manager.stats()["clients"] == 1 and manager.clients_evicted == 1
+    assert manager.subscriber_count("prices") == 1
+
+
+def test_send_error_evicts_client():
+    async def scenario():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        websocket.failing = True
+        await manager.connect(websocket, ["prices"])
+        manager.send(websocket, "hello")
+        await asyncio.sleep(0.01)
+        return manager, websocket
+
+    manager, websocket = asyncio.run(scenario())
+    assert manager.active_connections == {} and manager.topics == {}
+    assert websocket.closed == 1013 and manager.clients_evicted == 1
@@ -0,0 +1,40 @@
+import orjson
+
+from backend.delta import PriceStream, diff_markets
+from backend.markets import MarketSnapshot
+
+
+def coin(coin_id: str, price: float, symbol: str = None) -> dict:
+    return {"id": coin_id, "symbol": symbol or coin_id[:3], "current_price": price}
+
+
+def test_diff_markets():
+    previous = [coin("bitcoin", 1.0), coin("ethereum", 2.0), coin("solana", 3.0)]
+    current = [coin("bitcoin", 1.5), coin("ethereum", 2.0), coin("cardano", 4.0)]
+    delta = diff_markets(previous, current)
+    assert delta["changes"] == {"bitcoin": {"current_price": 1.5}, "cardano": current[2]}
+    assert delta["removed"] == ["solana"]
+    assert delta["order"] == ["bitcoin", "ethereum", "cardano"]
+    assert diff_markets(current, current) == {"changes": {}, "removed": [], "order": None}
+
+
+def test_stream_snapshot_then_deltas():
+    stream = PriceStream("prices", orjson.dumps, size=2)
+    first = MarketSnapshot([coin("bitcoin", 1.0), coin("ethereum", 2.0), coin("solana", 3.0)])
+    snapshot = orjson.loads(stream.update(first, now=0))
+    assert snapshot == {"type": "price_update", "seq": 1, "data": first[:2].to_list()}
+    assert stream.update(first, now=1) is None
+
+    second = MarketSnapshot([coin("bitcoin", 1.5), coin("ethereum", 2.0), coin("solana", 3.0)])
+    delta = orjson.loads(stream.update(second, now=2))
+    assert delta == {"type": "price_delta", "seq": 2, "base": 1, "changes": {"bitcoin": {"current_price": 1.5}}}
+    assert stream.snapshot_message() is stream.snapshot_message()
+
+
+def test_stream_symbols_and_interval():
+    stream = PriceStream("prices:sol", orjson.dumps, symbols={"sol", "ethereum"}, interval=10)
+    markets = MarketSnapshot([coin("bitcoin", 1.0), coin("ethereum", 2.0), coin("solana", 3.0, "SOL")])
+    assert [c["id"] for c in orjson.loads(stream.update(markets, now=100))["data"]] == ["ethereum", "solana"]
+    changed = MarketSnapshot([coin("bitcoin", 1.0), coin("ethereum", 2.5), coin("solana", 3.0, "SOL")])
+    assert stream.update(changed, now=105) is None
+    assert orjson.loads(stream.update(changed, now=110))["changes"] == {"ethereum": {"current_price": 2.5}}
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from backend import indicators
+from backend.indicators import batch_indicators, compute_indicators
+
+
+def sample_series() -> list:
+    rng = random.Random(11)
+    series = []
+    for _ in range(20):
+        prices = [rng.uniform(0.001, 60000)]
+        for _ in range(167):
+            prices.append(prices[-1] * (1 + rng.gauss(0, 0.01)))
+        series.append(prices)
+    series += [
+        [1.0] * 168,  # constant: zero variance, flat range, no losses
+        [5.0] * 30,
+        [float(i) for i in range(1, 169)],  # only gains
+        [float(i) for i in range(168, 0, -1)],  # only losses
+        [42.0],
+        [1.0, 2.0, 3.0],
+        [float(i % 5) for i in range(14)],  # exactly the RSI/stochastic period
+        [float(i % 7) for i in range(20)],  # exactly the Bollinger period
+        [float(i % 3) for i in range(26)],  # exactly the MACD slow period
+    ]
+    return series
+
+
+def test_numpy_batch_identical_to_python():
+    if indicators.np is None:
+        pytest.skip("numpy not installed")
+    series = sample_series()
+    assert batch_indicators(series) == [compute_indicators(prices) for prices in series]
+
+
+def test_batch_without_numpy(monkeypatch):
+    monkeypatch.setattr(indicators, "np", None)
+    series = sample_series()
+    assert batch_indicators(series) == [compute_indicators(prices) for prices in series]
@@ -0,0 +1,37 @@
+import orjson
+
+from backend.markets import MarketSnapshot
+
+
+def sample_markets(count: int = 5) -> list:
+    return [{
+        "id": f"coin-{i}",
+        "symbol": f"c{i}",
+        "current_price": 0.1 + i * 1.37,
+        "market_cap": 10 ** 12 - i,
+        "high_24h": None if i == 2 else 1.5,
+        "sparkline_in_7d": {"price": [0.1 + i, 0.2 + i, None if i == 3 else 0.3 + i, 1 / 3]},
+    } for i in range(count)]
+
+
+def test_round_trip_is_exact():
+    markets = sample_markets()
+    snapshot = MarketSnapshot(markets)
+    assert snapshot.to_list() == markets
+    assert orjson.dumps(snapshot.to_list()) == orjson.dumps(markets)
+
+
+def test_slice_is_view():
+    markets = sample_markets()
+    view = MarketSnapshot(markets)[1:4]
+    assert len(view) == 3
+    assert [coin["id"] for coin in view] == ["coin-1", "coin-2", "coin-3"]
+    assert view[2] == markets[3]
+
+
+def test_column_reads():
+    markets = sample_markets()
+    snapshot = MarketSnapshot(markets)
+    assert list(snapshot.values("id")) == [coin["id"] for coin in markets]
+    assert list(snapshot.values("current_price")) == [coin["current_price"] for coin in markets]
+    assert list(snapshot.sparkline(1)) == markets[1]["sparkline_in_7d"]["price"]
@@ -0,0 +1,33 @@
+from backend.normalize import (map_coinstats_market, map_cryptocompare_market, normalize_markets,
+                               points_to_candles)
+
+
+def test_cryptocompare_rows():
+    rows = [
+        {"CoinInfo": {"Name": "BTC", "FullName": "Bitcoin", "ImageUrl": "/media/btc.png"},
+         "RAW": {"USD": {"PRICE": 50000, "MKTCAP": 1e12, "HIGH24HOUR": 51000}}},
+        {},
+    ]
+    first, empty = normalize_markets(rows, map_cryptocompare_market, first_rank=11)
+    assert first["id"] == first["symbol"] == "btc"
+    assert first["image"] == "https://cryptocompare.com/media/btc.png"
+    assert first["current_price"] == 50000.0 and first["market_cap_rank"] == 11
+    assert first["high_24h"] == 51000.0 and first["low_24h"] is None
+    assert empty["id"] == "" and empty["current_price"] == 0.0 and empty["market_cap_rank"] == 12
+    assert first["sparkline_in_7d"] is not empty["sparkline_in_7d"]
+
+
+def test_coinstats_rank_fallback():
+    rows = [{"id": "Bitcoin", "symbol": "BTC", "rank": 1, "priceChange1w": "2.5"}, {"id": "x", "symbol": "X"}]
+    ranked, unranked = normalize_markets(rows, map_coinstats_market, first_rank=5)
+    assert ranked["id"] == "bitcoin" and ranked["market_cap_rank"] == 1
+    assert ranked["price_change_percentage_7d_in_currency"] == 2.5
+    assert unranked["market_cap_rank"] == 6 and unranked["circulating_supply"] is None
+
+
+def test_points_to_candles():
+    points = [[0, 1.0], [1800, 3.0], [3000, 2.0], [3600, 4.0], [4000, None]]
+    assert points_to_candles(points) == [
+        {"time": 0, "open": 1.0, "high": 3.0, "low": 1.0, "close": 2.0, "volumefrom": None, "volumeto": None},
+        {"time": 3600, "open": 4.0, "high": 4.0, "low": 4.0, "close": 4.0, "volumefrom": None, "volumeto": None},
+    ]
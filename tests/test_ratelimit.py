@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from backend.ratelimit import PRIORITY_ADHOC, PRIORITY_REALTIME, RateLimitExceeded, TokenBucket
+
+
+def test_burst_then_deadline():
+    async def scenario():
+        bucket = TokenBucket("test", rate=1, burst=2)
+        await bucket.acquire()
+        await bucket.acquire()
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire(deadline=0.1)
+        return bucket.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["granted"] == 2 and stats["rejected"] == 1
+
+
+def test_full_queue_fails_fast():
+    async def scenario():
+        bucket = TokenBucket("test", rate=100, burst=1, max_queue=1)
+        await bucket.acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire()
+        await waiter
+
+    asyncio.run(scenario())
+
+
+def test_priority_order():
+    async def scenario():
+        bucket = TokenBucket("test", rate=50, burst=1)
+        await bucket.acquire()
+        served = []
+
+        async def request(name, priority):
+            await bucket.acquire(priority)
+            served.append(name)
+
+        tasks = [asyncio.create_task(request("adhoc", PRIORITY_ADHOC))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("realtime", PRIORITY_REALTIME)))
+        await asyncio.gather(*tasks)
+        return served
+
+    assert asyncio.run(scenario()) == ["realtime", "adhoc"]
@@ -0,0 +1,59 @@
+from backend.registry import CoinRegistry
+
+
+def coin(coin_id, symbol, name, rank):
+    return {"id": coin_id, "symbol": symbol, "name": name, "market_cap_rank": rank, "image": f"https://img/{coin_id}.png"}
+
+
+COINGECKO = [
+    coin("bitcoin", "btc", "Bitcoin", 1),
+    coin("ethereum", "eth", "Ethereum", 2),
+    coin("bitcoin-cash", "bch", "Bitcoin Cash", 15),
+    coin("ethena", "ena", "Ethena", 40),
+    coin("ethereum-classic", "etc", "Ethereum Classic", 25),
+    coin("bitcoin-bep2", "btc", "Bitcoin BEP2", 900),  # same ticker as bitcoin
+]
+
+
+def test_ticker_collision_resolves_to_best_ranked():
+    registry = CoinRegistry()
+    registry.ingest(COINGECKO)
+    assert registry.resolve("BTC").id == "bitcoin"
+    assert registry.provider_id("btc", "coingecko") == "bitcoin"
+    assert registry.provider_id("bitcoin-bep2", "coingecko") == "bitcoin-bep2"
+    assert registry.provider_id("bitcoin", "cryptocompare") == "BTC"
+    assert registry.provider_id("unknown-coin", "cryptocompare") == "UNKNOWN-COIN"
+    assert registry.provider_id("unknown-coin", "coinstats") == "unknown-coin"
+
+
+def test_cryptocompare_rows_merge_into_known_slugs():
+    registry = CoinRegistry()
+    registry.ingest(COINGECKO)
+    # A later refresh served by CryptoCompare, whose ids are tickers
+    registry.ingest([coin("btc", "btc", "Bitcoin", 1), coin("xmr", "xmr", "Monero", 30)])
+    assert "btc" not in registry.records  # attached to bitcoin, not a new coin
+    assert registry.resolve("btc").id == "bitcoin"
+    assert registry.records["xmr"].ticker_only
+    assert registry.stats()["coins"] == len(COINGECKO) + 1
+
+
+def test_slug_replaces_ticker_placeholder():
+    registry = CoinRegistry()
+    registry.ingest([coin("xmr", "xmr", "Monero", 30)])
+    registry.ingest([coin("monero", "xmr", "Monero", 30)])
+    assert "xmr" not in registry.records
+    assert registry.provider_id("xmr", "coingecko") == "monero"
+    assert registry.provider_id("monero", "cryptocompare") == "XMR"
+
+
+def test_search_exact_then_prefix_then_fuzzy_by_market_cap():
+    registry = CoinRegistry()
+    registry.ingest(COINGECKO)
+    assert [r.id for r in registry.search("btc")] == ["bitcoin", "bitcoin-bep2"]
+    # Exact symbol first, then prefix matches by rank
+    assert [r.id for r in registry.search("eth")] == ["ethereum", "ethereum-classic", "ethena"]
+    assert [r.id for r in registry.search("bitcoin")] == ["bitcoin", "bitcoin-cash", "bitcoin-bep2"]
+    assert [r.id for r in registry.search("bitcoin", limit=2)] == ["bitcoin", "bitcoin-cash"]
+    # A typo only reaches the trigram index
+    assert registry.search("etherium")[0].id == "ethereum"
+    assert registry.search("") == [] and registry.search("zzzz") == []
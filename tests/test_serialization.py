@@ -0,0 +1,45 @@
+from array import array
+
+import msgpack
+
+from backend.serialization import FLOAT32_EXT, JSON, MSGPACK, MSGPACK_MEDIA_TYPES, Payload, etag_matches, loads, negotiate, packb
+
+
+def unpack(data):
+    def ext_hook(code, payload):
+        assert code == FLOAT32_EXT
+        return array("f", payload).tolist()
+    return msgpack.unpackb(data, ext_hook=ext_hook, raw=False)
+
+
+def test_long_float_lists_are_packed_as_float32():
+    prices = [100.25 + i for i in range(20)]
+    packed = msgpack.unpackb(packb({"price": prices}), raw=False)
+    assert isinstance(packed["price"], msgpack.ExtType)
+    assert unpack(packb({"price": prices}))["price"] == prices  # exactly representable in float32
+
+
+def test_int_and_short_lists_stay_native():
+    timestamps = list(range(1700000000, 1700000016))
+    mixed = [1.5] * 15 + [2]
+    data = {"times": timestamps, "mixed": mixed, "short": [1.5, 2.5]}
+    assert unpack(packb(data)) == data
+
+
+def test_negotiate():
+    assert negotiate("application/msgpack") == MSGPACK
+    assert negotiate("application/json, */*") == JSON
+    assert negotiate("") == JSON
+
+
+def test_payload_encodes_once_and_answers_conditional_requests():
+    payload = Payload({"a": [1, 2]})
+    assert payload.encode(JSON) is payload.encode(JSON)
+    assert loads(payload.encode(JSON)) == {"a": [1, 2]}
+    etag = payload.etag(JSON)
+    assert etag_matches(f'W/{etag}, "other"', etag)
+    response = payload.response("", if_none_match=etag)
+    assert response.status_code == 304 and response.headers["etag"] == etag
+    response = payload.response("application/msgpack", if_none_match="")
+    assert response.status_code == 200 and response.media_type == MSGPACK_MEDIA_TYPES[0]
+    assert unpack(response.body) == {"a": [1, 2]}
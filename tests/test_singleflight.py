@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+
+class Upstream:
+    def __init__(self, delay: float = 0.05, result="data"):
+        self.delay = delay
+        self.result = result
+        self.calls = 0
+        self.cancelled = 0
+
+    async def fetch(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flights = SingleFlight()
+        upstream = Upstream()
+        results = await asyncio.gather(*(flights.do("markets", upstream.fetch) for _ in range(50)))
+        other = await flights.do("global", upstream.fetch)
+        return flights, upstream, results, other
+
+    flights, upstream, results, other = asyncio.run(scenario())
+    assert results == ["data"] * 50 and other == "data"
+    assert upstream.calls == 2
+    assert flights.stats() == {"in_flight": 0, "calls": 2, "shared": 49}
+
+
+def test_callers_share_exceptions():
+    async def scenario():
+        flights = SingleFlight()
+        upstream = Upstream(result=RuntimeError("429"))
+        return upstream, await asyncio.gather(*(flights.do("k", upstream.fetch) for _ in range(3)),
+                                              return_exceptions=True)
+
+    upstream, results = asyncio.run(scenario())
+    assert upstream.calls == 1 and all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_one_caller_leaving_keeps_the_shared_fetch():
+    async def scenario():
+        flights = SingleFlight()
+        upstream = Upstream()
+        leaving = asyncio.create_task(flights.do("k", upstream.fetch))
+        staying = asyncio.create_task(flights.do("k", upstream.fetch))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return upstream, await staying
+
+    upstream, result = asyncio.run(scenario())
+    assert result == "data" and upstream.calls == 1 and upstream.cancelled == 0
+
+
+def test_fetch_cancelled_once_every_caller_left():
+    async def scenario():
+        flights = SingleFlight()
+        upstream = Upstream(delay=10)
+        callers = [asyncio.create_task(flights.do("k", upstream.fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for caller in callers[:2]:
+            caller.cancel()
+        await asyncio.sleep(0.01)
+        assert upstream.cancelled == 0  # one caller is still waiting
+        callers[2].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return flights, upstream
+
+    flights, upstream = asyncio.run(scenario())
+    assert upstream.cancelled == 1
+    assert flights.stats()["in_flight"] == 0
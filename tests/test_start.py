@@ -0,0 +1,37 @@
+import os
+
+import start
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_cgroup_v2_quota(tmp_path):
+    write(tmp_path / "cpu.max", "150000 100000\n")
+    assert start.cgroup_cpu_limit(str(tmp_path)) == 2
+    write(tmp_path / "cpu.max", "max 100000\n")
+    assert start.cgroup_cpu_limit(str(tmp_path)) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    write(tmp_path / "cpu" / "cpu.cfs_quota_us", "50000\n")
+    write(tmp_path / "cpu" / "cpu.cfs_period_us", "100000\n")
+    assert start.cgroup_cpu_limit(str(tmp_path)) == 1
+    write(tmp_path / "cpu" / "cpu.cfs_quota_us", "-1\n")
+    assert start.cgroup_cpu_limit(str(tmp_path)) is None
+
+
+def test_no_cgroup_files(tmp_path):
+    assert start.cgroup_cpu_limit(str(tmp_path)) is None
+
+
+def test_available_cpus_capped_by_quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(64)), raising=False)
+    assert start.available_cpus(str(tmp_path)) == 64
+    write(tmp_path / "cpu.max", "200000 100000\n")
+    assert start.available_cpus(str(tmp_path)) == 2
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0}, raising=False)
+    assert start.available_cpus(str(tmp_path)) == 1
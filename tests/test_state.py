@@ -0,0 +1,162 @@
+import asyncio
+
+from backend.state import LocalState, RedisState, RespConnection
+from tests.resp_server import RespServer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def started(server, count=1):
+    states = [RedisState(server.url) for _ in range(count)]
+    for state in states:
+        await state.start()
+    return states
+
+
+def test_get_set_with_expiry():
+    async def scenario():
+        server = await RespServer().start()
+        state, = await started(server)
+        await state.set("plain", b"1")
+        await state.set("short", b"2", ttl=0.05)
+        assert await state.get("plain") == b"1"
+        assert await state.get("short") == b"2"
+        await asyncio.sleep(0.1)
+        assert await state.get("short") is None
+        assert await state.get("missing") is None
+        await state.close()
+        await server.stop()
+    run(scenario())
+
+
+def test_lease_acquire_renew_release_and_expiry():
+    async def scenario():
+        server = await RespServer().start()
+        a, b = await started(server, 2)
+        assert await a.lead("poller", 1)
+        assert not await b.lead("poller", 1)
+        assert await a.lead("poller", 1)  # renewal by the holder
+        await a.release("poller")
+        assert await b.lead("poller", 0.05)
+        assert not await a.lead("poller", 1)
+        await asyncio.sleep(0.1)  # b stops renewing; its lease expires
+        assert await a.lead("poller", 1)
+        for state in (a, b):
+            await state.close()
+        await server.stop()
+    run(scenario())
+
+
+def test_close_releases_leases():
+    async def scenario():
+        server = await RespServer().start()
+        a, b = await started(server, 2)
+        assert await a.lead("poller", 10)
+        await a.close()
+        assert await b.lead("poller", 10)
+        await b.close()
+        await server.stop()
+    run(scenario())
+
+
+def test_publish_reaches_every_subscriber():
+    async def scenario():
+        server = await RespServer().start()
+        a, b = await started(server, 2)
+        received = {"a": [], "b": []}
+
+        async def on_a(message):
+            received["a"].append(message)
+
+        async def on_b(message):
+            received["b"].append(message)
+
+        await a.subscribe("markets", on_a)
+        await b.subscribe("markets", on_b)
+        while sum(len(writers) for writers in server.subscribers.values()) < 2:
+            await asyncio.sleep(0.01)
+        await a.publish("markets", b"[1,2]")
+        for _ in range(100):
+            if received["a"] and received["b"]:
+                break
+            await asyncio.sleep(0.01)
+        assert received == {"a": [b"[1,2]"], "b": [b"[1,2]"]}
+        for state in (a, b):
+            await state.close()
+        await server.stop()
+    run(scenario())
+
+
+def test_publish_delivers_locally_when_server_is_down():
+    async def scenario():
+        server = await RespServer().start()
+        state, = await started(server)
+        received = []
+
+        async def handler(message):
+            received.append(message)
+
+        state.handlers["markets"] = [handler]
+        await server.stop()
+        state.conn.abort()
+        state.options["port"] = state.conn.port = 1  # nothing listens here
+        await state.publish("markets", b"x")
+        assert received == [b"x"]
+        assert state.errors == 1
+    run(scenario())
+
+
+def test_read_through_loads_once_across_workers():
+    async def scenario():
+        server = await RespServer().start()
+        a, b = await started(server, 2)
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            await asyncio.sleep(0.3)
+            return {"value": 1}
+
+        results = await asyncio.gather(a.read_through("k", loader, 10), b.read_through("k", loader, 10))
+        assert results == [{"value": 1}, {"value": 1}]
+        assert len(loads) == 1
+        for state in (a, b):
+            await state.close()
+        await server.stop()
+    run(scenario())
+
+
+def test_cancelled_command_does_not_leak_its_reply():
+    async def scenario():
+        server = await RespServer(delay=0.1).start()
+        conn = RespConnection("127.0.0.1", server.port)
+        await conn.execute("SET", "a", "first")
+        await conn.execute("SET", "b", "second")
+        task = asyncio.create_task(conn.execute("GET", "a"))
+        await asyncio.sleep(0.05)  # written, reply not yet sent
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert await conn.execute("GET", "b") == b"second"
+        await conn.close()
+        await server.stop()
+    run(scenario())
+
+
+def test_local_state_dispatches_inline():
+    async def scenario():
+        state = LocalState()
+        received = []
+
+        async def handler(message):
+            received.append(message)
+
+        await state.subscribe("signals", handler)
+        await state.publish("signals", b"s")
+        assert received == [b"s"]
+        assert await state.lead("poller", 1)
+    run(scenario())
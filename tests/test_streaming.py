@@ -0,0 +1,132 @@
+import copy
+import math
+import random
+
+import pytest
+
+from backend.streaming import EMA, MACD, IndicatorState, RollingBollinger, RollingRange, WilderRSI
+
+
+def random_series(count: int = 300, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(count - 1):
+        prices.append(max(0.01, prices[-1] * (1 + rng.gauss(0, 0.02))))
+    return prices
+
+
+def reference_ema(prices, period):
+    """EMA over the whole series, seeded with the SMA of the first `period` prices"""
+    if len(prices) < period:
+        return None
+    value = sum(prices[:period]) / period
+    alpha = 2 / (period + 1)
+    for price in prices[period:]:
+        value += alpha * (price - value)
+    return value
+
+
+def reference_rsi(prices, period):
+    changes = [b - a for a, b in zip(prices, prices[1:])]
+    if len(changes) < period:
+        return None
+    gains = [max(c, 0.0) for c in changes]
+    losses = [max(-c, 0.0) for c in changes]
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def reference_macd(prices, fast=12, slow=26, signal=9):
+    lines = [reference_ema(prices[:n], fast) - reference_ema(prices[:n], slow)
+             for n in range(slow, len(prices) + 1)]
+    return (lines[-1] if lines else None), reference_ema(lines, signal)
+
+
+def reference_bollinger(prices, period=20, std_dev=2):
+    if len(prices) < period:
+        return None, None, None
+    window = prices[-period:]
+    mean = sum(window) / period
+    std = (sum((p - mean) ** 2 for p in window) / period) ** 0.5
+    return mean + std_dev * std, mean, mean - std_dev * std
+
+
+def close(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def state_of(indicator):
+    return copy.deepcopy({slot: getattr(indicator, slot) for cls in type(indicator).__mro__
+                          for slot in getattr(cls, "__slots__", ())})
+
+
+@pytest.mark.parametrize("period", [3, 12, 26])
+def test_ema_matches_recompute(period):
+    prices = random_series(80)
+    ema = EMA(period)
+    for n, price in enumerate(prices, 1):
+        assert close(ema.peek(price), reference_ema(prices[:n], period))
+        assert close(ema.push(price), reference_ema(prices[:n], period))
+
+
+def test_wilder_rsi_matches_recompute():
+    prices = random_series(120)
+    rsi = WilderRSI(14)
+    for n, price in enumerate(prices, 1):
+        assert close(rsi.peek(price), reference_rsi(prices[:n], 14) if n > 1 else None)
+        rsi.push(price)
+        assert close(rsi.value, reference_rsi(prices[:n], 14))
+
+
+def test_macd_matches_recompute():
+    prices = random_series(90)
+    macd = MACD()
+    for n, price in enumerate(prices, 1):
+        line, signal = macd.peek(price)
+        expected_line, expected_signal = reference_macd(prices[:n])
+        assert close(line, expected_line) and close(signal, expected_signal)
+        macd.push(price)
+
+
+def test_bollinger_matches_recompute():
+    prices = random_series(200)
+    bollinger = RollingBollinger(20, 2)
+    for n, price in enumerate(prices, 1):
+        expected = reference_bollinger(prices[:n])
+        assert all(close(a, b) for a, b in zip(bollinger.peek(price), expected))
+        bollinger.push(price)
+
+
+@pytest.mark.parametrize("period", [1, 14, 168])
+def test_rolling_range_matches_recompute(period):
+    prices = random_series(400)
+    prices[50:60] = [prices[50]] * 10  # repeated extremes
+    window = RollingRange(period)
+    for n, price in enumerate(prices, 1):
+        recent = prices[max(0, n - period):n]
+        assert window.peek(price) == (min(recent), max(recent))
+        window.push(price)
+
+
+def test_peek_does_not_change_state():
+    prices = random_series(200)
+    state = IndicatorState()
+    rng = random.Random(3)
+    for price in prices:
+        before = {name: state_of(getattr(state, name)) for name in ("rsi", "bollinger", "stochastic", "range_7d")}
+        macd_before = [state_of(ema) for ema in (state.macd.fast, state.macd.slow, state.macd.signal)]
+        first = state.peek(price * (1 + rng.uniform(-0.1, 0.1)))
+        assert state.peek(price * 1.05) == state.peek(price * 1.05)
+        after = {name: state_of(getattr(state, name)) for name in ("rsi", "bollinger", "stochastic", "range_7d")}
+        assert after == before
+        assert [state_of(ema) for ema in (state.macd.fast, state.macd.slow, state.macd.signal)] == macd_before
+        assert set(first) >= {"rsi", "macd", "macd_signal", "bollinger_upper", "high", "low"}
+        state.push(price)